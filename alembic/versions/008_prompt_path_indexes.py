@@ -0,0 +1,50 @@
+"""Add indexes for the queries run on every message
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Recent history window (ORDER BY created_at DESC LIMIT n)
+    op.create_index("ix_conversations_created_at", "conversations", ["created_at"])
+
+    # Active soul doc entries only
+    op.create_index(
+        "ix_soul_doc_active", "soul_doc", ["created_at"],
+        postgresql_where=sa.text("superseded_at IS NULL"),
+    )
+
+    # Project context: open goals and latest log per project
+    op.create_index(
+        "ix_project_goals_open", "project_goals", ["project_id", "created_at"],
+        postgresql_where=sa.text("achieved IS NOT TRUE"),
+    )
+    op.create_index("ix_project_logs_project_logged", "project_logs", ["project_id", "logged_at"])
+
+    # Today's schedule and weekly lookups
+    op.create_index("ix_schedule_events_date_status", "schedule_events", ["date", "status"])
+    op.create_index("ix_schedule_events_week_start", "schedule_events", ["week_start"])
+
+    # Latest pending plan
+    op.create_index("ix_pending_plans_status_created", "pending_plans", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pending_plans_status_created", table_name="pending_plans")
+    op.drop_index("ix_schedule_events_week_start", table_name="schedule_events")
+    op.drop_index("ix_schedule_events_date_status", table_name="schedule_events")
+    op.drop_index("ix_project_logs_project_logged", table_name="project_logs")
+    op.drop_index("ix_project_goals_open", table_name="project_goals")
+    op.drop_index("ix_soul_doc_active", table_name="soul_doc")
+    op.drop_index("ix_conversations_created_at", table_name="conversations")
@@ -0,0 +1,39 @@
+"""Add indexes for the fitness status and logging lookups
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Session for a date and most recent sessions (ORDER BY date DESC LIMIT n)
+    op.create_index("ix_workout_sessions_date", "workout_sessions", ["date"])
+
+    # Last weight / history for one exercise (WHERE exercise = ? ORDER BY created_at DESC)
+    op.create_index("ix_exercise_logs_exercise_created", "exercise_logs", ["exercise", "created_at"])
+
+    # Active modifications only
+    op.create_index(
+        "ix_workout_modifications_active", "workout_modifications", ["valid_from"],
+        postgresql_where=sa.text("status = 'active'"),
+    )
+
+    # Weight trend (ORDER BY date DESC LIMIT n)
+    op.create_index("ix_weigh_ins_date", "weigh_ins", ["date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weigh_ins_date", table_name="weigh_ins")
+    op.drop_index("ix_workout_modifications_active", table_name="workout_modifications")
+    op.drop_index("ix_exercise_logs_exercise_created", table_name="exercise_logs")
+    op.drop_index("ix_workout_sessions_date", table_name="workout_sessions")
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from plato.config import logger
 from plato.db import (
@@ -18,6 +18,7 @@ from plato.db import (
     add_project_goal,
     achieve_goal,
     log_work,
+    log_work_by_slug,
     get_project_summary,
     format_projects_summary,
     format_project_detail,
@@ -51,6 +52,7 @@ from plato.db import (
     auto_complete_week,
     TRAINING_SPLIT,
     DAY_WEEKDAY_MAP,
+    EXERCISE_INFO,
 )
 from plato.calendar import (
     get_calendar_service,
@@ -60,23 +62,63 @@ from plato.calendar import (
     create_event,
     create_weekly_events,
     get_schedule_prompt,
-    COLOR_MAP,
 )
 
 
+# Closes the plan preview; a bare "approve" right after it approves the plan directly
+PLAN_APPROVAL_PROMPT = "Reply 'approve' to push to Google Calendar, or suggest changes."
+
+
+# Fields each action can't run without. Checked before dispatch, so a malformed
+# block is rejected with a clear message instead of failing partway through its writes.
+_REQUIRED_FIELDS = {
+    "add_soul": ("category", "content"),
+    "update_soul": ("category", "old_content", "content"),
+    "store_idea": ("idea",),
+    "park_idea": ("idea_id",),
+    "resolve_idea": ("idea_id", "status"),
+    "create_project": ("name", "slug"),
+    "log_work": ("slug", "summary"),
+    "add_goal": ("slug", "timeframe", "goal_text"),
+    "achieve_goal": ("goal_id",),
+    "update_project": ("slug", "status"),
+    "query_project": ("slug",),
+    "plan_week": ("events",),
+    "report_deviation": ("title", "reason"),
+    "add_event": ("date", "start", "end", "title"),
+    "cancel_event": ("date", "title"),
+    "edit_event": ("date", "title"),
+    "log_workout": ("day_label",),
+    "missed_workout": ("day_label",),
+    "log_weight": ("weight_kg",),
+    "log_sleep": ("hours",),
+    "modify_workout": ("exercise", "modification_type", "detail"),
+    "override_block": ("name", "phase", "start_date"),
+}
+
+
+def _action_date(action: dict) -> str:
+    """The action's "date", or today's if it didn't give one (only computed when needed)."""
+    return action.get("date") or date.today().isoformat()
+
+
 def _compute_week_start(week: str = "this") -> str:
     """Return Monday for the requested week. 'this' = current week, 'next' = next week."""
-    today = datetime.now()
+    today = date.today()
     weekday = today.weekday()  # 0=Mon
     monday = today - timedelta(days=weekday)
     if week == "next":
         monday += timedelta(days=7)
-    return monday.strftime("%Y-%m-%d")
+    return monday.isoformat()
 
 
 def process_action(action: dict) -> str:
     """Route a JSON action block from Claude and return a status message."""
     action_type = action.get("action")
+    missing = [f for f in _REQUIRED_FIELDS.get(action_type, ()) if f not in action]
+    if missing:
+        logger.error(f"Action '{action_type}' missing fields: {missing}")
+        return f"Action failed: missing {', '.join(missing)}"
     try:
         match action_type:
             case "add_soul":
@@ -116,6 +158,10 @@ def process_action(action: dict) -> str:
                 return f"Project '{action['name']}' created (slug: {action['slug']})."
 
             case "log_work":
+                # Exact slug: lookup + insert share one transaction
+                name = log_work_by_slug(action["slug"], action["summary"], action.get("duration_mins"), action.get("mood"))
+                if name:
+                    return f"Work logged on {name}."
                 project = get_project_by_slug(action["slug"])
                 if not project:
                     return f"Project '{action['slug']}' not found."
@@ -181,7 +227,7 @@ def process_action(action: dict) -> str:
                 for ev in sorted(events, key=lambda e: (e["date"], e["start"])):
                     if ev["date"] != current_date:
                         current_date = ev["date"]
-                        day_name = datetime.strptime(ev["date"], "%Y-%m-%d").strftime("%A %b %d")
+                        day_name = date.fromisoformat(ev["date"]).strftime("%A %b %d")
                         lines.append(f"\n{day_name}:")
                     lines.append(f"  {ev['start']}-{ev['end']}: {ev['title']} [{ev.get('category', '')}]")
 
@@ -200,7 +246,7 @@ def process_action(action: dict) -> str:
                             lines.append(f"  {p['display']}: {p['weight_kg']}kg × {p['sets']}×{p['reps']}")
 
                 lines.append(f"\nTotal events: {len(events)}")
-                lines.append("Reply 'approve' to push to Google Calendar, or suggest changes.")
+                lines.append(PLAN_APPROVAL_PROMPT)
                 return "\n".join(lines)
 
             case "approve_plan":
@@ -223,7 +269,7 @@ def process_action(action: dict) -> str:
                     return f"Plan approved in DB, but calendar push failed: {e}"
 
             case "audrey_time":
-                date_str = action.get("date", datetime.now().strftime("%Y-%m-%d"))
+                date_str = _action_date(action)
 
                 # Cancel in DB
                 db_count = cancel_evening_schedule_events(date_str)
@@ -244,7 +290,7 @@ def process_action(action: dict) -> str:
                     return "Evening cleared for Audrey time. No scheduled events to cancel."
 
             case "report_deviation":
-                date_str = action.get("date", datetime.now().strftime("%Y-%m-%d"))
+                date_str = _action_date(action)
                 found = db_report_deviation(date_str, action["title"], action["reason"])
                 if found:
                     return f"Deviation logged for {date_str}: {action['reason']}"
@@ -257,14 +303,13 @@ def process_action(action: dict) -> str:
                 title = action["title"]
                 category = action.get("category", "personal")
 
-                # Save to DB
+                # Save to DB first, so a failed write never leaves an untracked calendar event
                 save_schedule_event(date_str, start, end, title, category)
 
                 # Push to Google Calendar
                 try:
                     service = get_calendar_service()
-                    color = COLOR_MAP.get(category)
-                    create_event(service, date_str, start, end, title, action.get("description"), color)
+                    create_event(service, date_str, start, end, title, action.get("description"), category)
                 except Exception as e:
                     logger.error(f"Calendar event creation failed: {e}")
                     return f"Event '{title}' saved to DB on {date_str} {start}-{end}, but calendar push failed: {e}"
@@ -308,12 +353,11 @@ def process_action(action: dict) -> str:
                 try:
                     service = get_calendar_service()
                     cancel_specific_event(service, date_str, title_keyword)
-                    color = COLOR_MAP.get(old.get("category", ""))
                     create_event(service, new_date,
                                  new_start or old["start_time"],
                                  new_end or old["end_time"],
                                  new_title or old["title"],
-                                 color_id=color)
+                                 category=old.get("category"))
                 except Exception as e:
                     logger.error(f"Calendar edit failed: {e}")
                     return f"Event updated in DB, but calendar sync failed: {e}"
@@ -323,7 +367,7 @@ def process_action(action: dict) -> str:
             # --- Fitness actions ---
 
             case "log_workout":
-                date_str = action.get("date", datetime.now().strftime("%Y-%m-%d"))
+                date_str = _action_date(action)
                 day_label = action["day_label"]
                 status = action.get("status", "completed")
                 feedback = action.get("feedback")
@@ -364,7 +408,7 @@ def process_action(action: dict) -> str:
                 return ". ".join(parts) + "."
 
             case "missed_workout":
-                date_str = action.get("date", datetime.now().strftime("%Y-%m-%d"))
+                date_str = _action_date(action)
                 day_label = action["day_label"]
                 reason = action.get("reason", "")
                 log_session(date_str, day_label, status="missed", deviation_notes=reason)
@@ -373,7 +417,7 @@ def process_action(action: dict) -> str:
                 return f"Missed session logged: {label} on {date_str}. {('Reason: ' + reason) if reason else 'No reason given.'}"
 
             case "log_weight":
-                date_str = action.get("date", datetime.now().strftime("%Y-%m-%d"))
+                date_str = _action_date(action)
                 weight_kg = action["weight_kg"]
                 log_weigh_in(date_str, weight_kg, action.get("notes"))
                 trend = get_weight_trend()
@@ -418,7 +462,7 @@ def process_action(action: dict) -> str:
                 return " | ".join(parts)
 
             case "log_sleep":
-                date_str = action.get("date", datetime.now().strftime("%Y-%m-%d"))
+                date_str = _action_date(action)
                 hours = action["hours"]
                 log_sleep(date_str, hours, action.get("notes"))
                 avg = get_sleep_average()
@@ -465,14 +509,8 @@ def process_action(action: dict) -> str:
                         weight_kg=entry["weight_kg"],
                         starting_reps=entry.get("starting_reps"),
                     )
-                    ex_info = TRAINING_SPLIT
-                    # Find display name
-                    display = entry["exercise"]
-                    for day_data in TRAINING_SPLIT.values():
-                        for ex in day_data["exercises"]:
-                            if ex["name"] == entry["exercise"]:
-                                display = ex["display"]
-                                break
+                    ex_info = EXERCISE_INFO.get(entry["exercise"])
+                    display = ex_info["display"] if ex_info else entry["exercise"]
                     results.append(f"{display}: {result['weight_kg']}kg × {result['current_reps']} reps [{result['status']}]")
                 return f"Seeded {len(results)} exercise(s):\n" + "\n".join(results)
 
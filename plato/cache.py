@@ -0,0 +1,97 @@
+"""
+Plato Cache Module — in-process memoization for prompt context.
+
+Every commit bumps a revision counter for each table it wrote to, so
+cached values are dropped as soon as the rows they were built from
+change. A short TTL bounds staleness for writes made outside this process.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from itertools import chain
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Writes to these tables don't affect any cached context (history changes every turn)
+_UNTRACKED_TABLES = {"conversations"}
+
+_revision = 0
+_table_revisions = defaultdict(int)
+_revision_lock = threading.Lock()
+
+
+def _mark_dirty(session, tables) -> None:
+    session.info.setdefault("dirty_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    _mark_dirty(session, {obj.__table__.name for obj in chain(session.new, session.dirty, session.deleted)})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    """Bulk insert()/query.update()/delete() bypass the flush, so catch them here."""
+    mapper = orm_execute_state.bind_mapper
+    is_write = orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    if is_write and mapper is not None:
+        _mark_dirty(orm_execute_state.session, {mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_revision(session):
+    global _revision
+    tables = session.info.pop("dirty_tables", None)
+    if not tables:
+        return
+    with _revision_lock:
+        for table in tables:
+            _table_revisions[table] += 1
+        if tables - _UNTRACKED_TABLES:
+            _revision += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("dirty_tables", None)
+
+
+def db_revision(*tables: str) -> int:
+    """Current data revision. With no args, changes whenever any tracked table is
+    committed; with table names, only when one of those tables is."""
+    if not tables:
+        return _revision
+    return sum(_table_revisions[t] for t in tables)
+
+
+def ttl_cache(seconds: float, tables: tuple[str, ...] = ()):
+    """Memoize a function on its arguments for up to `seconds`.
+    Entries are ignored once the DB revision (of `tables`, or of all tracked
+    tables if none are given) moves past the one they were built at."""
+    def decorator(fn):
+        entries = {}
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            revision = db_revision(*tables)
+            now = time.monotonic()
+            with lock:
+                hit = entries.get(key)
+            if hit and hit[0] == revision and now < hit[1]:
+                return hit[2]
+
+            value = fn(*args, **kwargs)
+            with lock:
+                for stale in [k for k, (_, expires, _) in entries.items() if expires <= now]:
+                    del entries[stale]
+                entries[key] = (revision, now + seconds, value)
+            return value
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
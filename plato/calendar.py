@@ -3,14 +3,19 @@ Plato Calendar Module — Google Calendar integration for weekly planning.
 """
 
 import os
-import json
 import logging
+import threading
 from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from functools import lru_cache
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Calendar Plato's events live in. Point this at a dedicated secondary calendar so
+# listings return only Plato's events; on 'primary' they're picked out by title.
+PLATO_CALENDAR_ID = os.environ.get("PLATO_CALENDAR_ID", "primary")
+
 COLOR_MAP = {
     "cfa": "9",        # Blueberry
     "nitrogen": "10",  # Basil
@@ -25,7 +30,23 @@ COLOR_MAP = {
 }
 
 
+# Socket timeout for Calendar API calls
+CALENDAR_TIMEOUT_SECONDS = 30
+
+# One service per worker thread: built once (OAuth refresh + discovery), then reused.
+# The underlying httplib2 transport isn't thread-safe, so threads don't share one.
+_local = threading.local()
+
+
 def get_calendar_service():
+    """Return this thread's Google Calendar service, building it on first use."""
+    service = getattr(_local, "service", None)
+    if service is None:
+        service = _local.service = _build_calendar_service()
+    return service
+
+
+def _build_calendar_service():
     """Build Google Calendar service from env var credentials."""
     refresh_token = os.environ.get("GOOGLE_REFRESH_TOKEN")
     client_id = os.environ.get("GOOGLE_CLIENT_ID")
@@ -39,6 +60,12 @@ def get_calendar_service():
         }.items() if not v]
         raise ValueError(f"Missing Google Calendar credentials: {missing}")
 
+    # Imported here: the Google client stack is heavy and only needed for calendar actions
+    import httplib2
+    from google.oauth2.credentials import Credentials
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build
+
     creds = Credentials(
         token=None,
         refresh_token=refresh_token,
@@ -46,11 +73,78 @@ def get_calendar_service():
         client_secret=client_secret,
         token_uri="https://oauth2.googleapis.com/token"
     )
-    service = build('calendar', 'v3', credentials=creds)
+    # The service keeps this transport (and its keep-alive connection) for the thread's
+    # lifetime; httplib2 has no timeout by default, so a stalled call would hold a worker
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=CALENDAR_TIMEOUT_SECONDS))
+    # The discovery doc ships with the client library; skip the file-cache lookup
+    service = build('calendar', 'v3', http=http, cache_discovery=False)
     logger.info("Google Calendar service built successfully")
     return service
 
 
+# Fixed daily layouts. Shared by every generated template, so treat them as read-only.
+_OFFICE_GYM_BLOCKS = [
+    {"start": "07:30", "end": "08:00", "type": "commute_prep", "label": "Get ready, lift to Luas"},
+    {"start": "08:00", "end": "09:00", "type": "commute", "label": "Luas to Citco"},
+    {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (Office)"},
+    {"start": "18:00", "end": "19:30", "type": "commute", "label": "Walk > Luas > Walk home"},
+    {"start": "19:30", "end": "19:45", "type": "commute", "label": "Travel to gym"},
+    {"start": "19:45", "end": "20:50", "type": "fixed", "label": "Gym session"},
+    {"start": "20:50", "end": "21:10", "type": "commute", "label": "Travel home from gym"},
+    {"start": "21:10", "end": "23:00", "type": "free", "label": "Evening block (1.8 hrs)"},
+]
+_OFFICE_BLOCKS = [
+    {"start": "07:30", "end": "08:00", "type": "commute_prep", "label": "Get ready, lift to Luas"},
+    {"start": "08:00", "end": "09:00", "type": "commute", "label": "Luas to Citco"},
+    {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (Office)"},
+    {"start": "18:00", "end": "19:30", "type": "commute", "label": "Walk > Luas > Walk home"},
+    {"start": "19:30", "end": "23:00", "type": "free", "label": "Evening block (3.5 hrs)"},
+]
+_WFH_GYM_BLOCKS = [
+    {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
+    {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (WFH)"},
+    {"start": "18:00", "end": "18:15", "type": "commute", "label": "Travel to gym"},
+    {"start": "18:15", "end": "19:20", "type": "fixed", "label": "Gym session"},
+    {"start": "19:20", "end": "19:40", "type": "commute", "label": "Travel home from gym"},
+    {"start": "19:40", "end": "23:00", "type": "free", "label": "Evening block (3.3 hrs)"},
+]
+_WFH_BLOCKS = [  # no WFH day without the gym at the moment
+    {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
+    {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (WFH)"},
+    {"start": "18:00", "end": "23:00", "type": "free", "label": "Evening block (5 hrs)"},
+]
+_SATURDAY_BLOCKS = [
+    {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
+    {"start": "09:15", "end": "10:45", "type": "fixed", "label": "Drive mam to guzheng school"},
+    {"start": "10:45", "end": "11:15", "type": "fixed", "label": "Click & collect groceries"},
+    {"start": "11:15", "end": "11:30", "type": "commute", "label": "Travel to gym"},
+    {"start": "11:30", "end": "12:35", "type": "fixed", "label": "Gym session"},
+    {"start": "12:35", "end": "12:50", "type": "commute", "label": "Travel home from gym"},
+    {"start": "12:50", "end": "15:00", "type": "free", "label": "Afternoon block (2.2 hrs)"},
+    {"start": "15:00", "end": "19:00", "type": "fixed", "label": "Project work"},
+    {"start": "19:00", "end": "20:30", "type": "fixed", "label": "Pick up mam from guzheng"},
+    {"start": "20:30", "end": "23:00", "type": "free", "label": "Evening block (2.5 hrs)"},
+]
+_SUNDAY_BLOCKS = [
+    {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
+    {"start": "09:00", "end": "10:30", "type": "fixed", "label": "Drive mam to guzheng school"},
+    {"start": "10:30", "end": "19:00", "type": "fixed", "label": "Project work"},
+    {"start": "19:00", "end": "20:30", "type": "fixed", "label": "Pick up mam from guzheng"},
+    {"start": "20:30", "end": "23:00", "type": "free", "label": "Evening block (2.5 hrs — keep light)"},
+]
+
+# (location, blocks) for Monday..Sunday: office Tue-Thu, gym Mon/Tue/Fri/Sat
+_WEEK_LAYOUT = (
+    ("wfh", _WFH_GYM_BLOCKS),
+    ("office", _OFFICE_GYM_BLOCKS),
+    ("office", _OFFICE_BLOCKS),
+    ("office", _OFFICE_BLOCKS),
+    ("wfh", _WFH_GYM_BLOCKS),
+    ("home", _SATURDAY_BLOCKS),
+    ("home", _SUNDAY_BLOCKS),
+)
+
+
 def get_weekly_template(week_start: datetime) -> dict:
     """
     Returns Jason's weekly availability template.
@@ -61,116 +155,80 @@ def get_weekly_template(week_start: datetime) -> dict:
     Mam driving: Sat 09:15-10:45 + 19:00-20:30, Sun 09:00-10:30 + 19:00-20:30
     Groceries: Sat 10:45-11:15
     """
-    office_days = [1, 2, 3]  # Tue, Wed, Thu (0-indexed from Mon)
-    gym_weekdays = [0, 1, 4]  # Mon, Tue, Fri
+    days = []
+    for day_offset, (location, blocks) in enumerate(_WEEK_LAYOUT):
+        current_date = week_start + timedelta(days=day_offset)
+        days.append({
+            "date": current_date.strftime("%Y-%m-%d"),
+            "day": current_date.strftime("%A"),
+            "location": location,
+            "blocks": blocks,
+        })
 
-    template = {
-        "week_start": week_start.strftime("%Y-%m-%d"),
-        "days": []
-    }
+    return {"week_start": week_start.strftime("%Y-%m-%d"), "days": days}
 
-    for day_offset in range(7):
-        current_date = week_start + timedelta(days=day_offset)
-        day_name = current_date.strftime("%A")
-
-        if day_offset < 5:  # Weekday
-            is_office = day_offset in office_days
-            is_gym_day = day_offset in gym_weekdays
-
-            if is_office and is_gym_day:
-                blocks = [
-                    {"start": "07:30", "end": "08:00", "type": "commute_prep", "label": "Get ready, lift to Luas"},
-                    {"start": "08:00", "end": "09:00", "type": "commute", "label": "Luas to Citco"},
-                    {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (Office)"},
-                    {"start": "18:00", "end": "19:30", "type": "commute", "label": "Walk > Luas > Walk home"},
-                    {"start": "19:30", "end": "19:45", "type": "commute", "label": "Travel to gym"},
-                    {"start": "19:45", "end": "20:50", "type": "fixed", "label": "Gym session"},
-                    {"start": "20:50", "end": "21:10", "type": "commute", "label": "Travel home from gym"},
-                    {"start": "21:10", "end": "23:00", "type": "free", "label": "Evening block (1.8 hrs)"},
-                ]
-            elif is_office:
-                blocks = [
-                    {"start": "07:30", "end": "08:00", "type": "commute_prep", "label": "Get ready, lift to Luas"},
-                    {"start": "08:00", "end": "09:00", "type": "commute", "label": "Luas to Citco"},
-                    {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (Office)"},
-                    {"start": "18:00", "end": "19:30", "type": "commute", "label": "Walk > Luas > Walk home"},
-                    {"start": "19:30", "end": "23:00", "type": "free", "label": "Evening block (3.5 hrs)"},
-                ]
-            else:
-                if is_gym_day:
-                    blocks = [
-                        {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
-                        {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (WFH)"},
-                        {"start": "18:00", "end": "18:15", "type": "commute", "label": "Travel to gym"},
-                        {"start": "18:15", "end": "19:20", "type": "fixed", "label": "Gym session"},
-                        {"start": "19:20", "end": "19:40", "type": "commute", "label": "Travel home from gym"},
-                        {"start": "19:40", "end": "23:00", "type": "free", "label": "Evening block (3.3 hrs)"},
-                    ]
-                else:
-                    blocks = [
-                        {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
-                        {"start": "09:00", "end": "18:00", "type": "work", "label": "Citco (WFH)"},
-                        {"start": "18:00", "end": "23:00", "type": "free", "label": "Evening block (5 hrs)"},
-                    ]
-
-            template["days"].append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "day": day_name,
-                "location": "office" if is_office else "wfh",
-                "blocks": blocks
-            })
-
-        else:  # Weekend
-            if day_offset == 5:  # Saturday
-                blocks = [
-                    {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
-                    {"start": "09:15", "end": "10:45", "type": "fixed", "label": "Drive mam to guzheng school"},
-                    {"start": "10:45", "end": "11:15", "type": "fixed", "label": "Click & collect groceries"},
-                    {"start": "11:15", "end": "11:30", "type": "commute", "label": "Travel to gym"},
-                    {"start": "11:30", "end": "12:35", "type": "fixed", "label": "Gym session"},
-                    {"start": "12:35", "end": "12:50", "type": "commute", "label": "Travel home from gym"},
-                    {"start": "12:50", "end": "15:00", "type": "free", "label": "Afternoon block (2.2 hrs)"},
-                    {"start": "15:00", "end": "19:00", "type": "fixed", "label": "Project work"},
-                    {"start": "19:00", "end": "20:30", "type": "fixed", "label": "Pick up mam from guzheng"},
-                    {"start": "20:30", "end": "23:00", "type": "free", "label": "Evening block (2.5 hrs)"},
-                ]
-            else:  # Sunday
-                blocks = [
-                    {"start": "07:30", "end": "09:00", "type": "fixed", "label": "Personal morning — do not schedule"},
-                    {"start": "09:00", "end": "10:30", "type": "fixed", "label": "Drive mam to guzheng school"},
-                    {"start": "10:30", "end": "19:00", "type": "fixed", "label": "Project work"},
-                    {"start": "19:00", "end": "20:30", "type": "fixed", "label": "Pick up mam from guzheng"},
-                    {"start": "20:30", "end": "23:00", "type": "free", "label": "Evening block (2.5 hrs — keep light)"},
-                ]
-
-            template["days"].append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "day": day_name,
-                "location": "home",
-                "blocks": blocks
-            })
-
-    return template
+
+# Calendar API calls per batch request (Google recommends staying at or under 50)
+BATCH_SIZE = 50
+
+
+def _execute_batched(service, requests: list) -> list:
+    """Execute API requests in batches (one HTTP round-trip per BATCH_SIZE).
+    Returns each request's error, or None if it succeeded, in request order."""
+    errors = [None] * len(requests)
+
+    def on_response(request_id, response, exception):
+        errors[int(request_id)] = exception
+
+    for start in range(0, len(requests), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_response)
+        for i in range(start, min(start + BATCH_SIZE, len(requests))):
+            batch.add(requests[i], request_id=str(i))
+        batch.execute()
+    return errors
+
+
+def _list_plato_events(service, time_min: str, time_max: str, **params) -> list[dict]:
+    """List Plato's events between two RFC3339 timestamps (id and summary only)."""
+    shared = PLATO_CALENDAR_ID == 'primary'
+    if shared:
+        params['q'] = '[Plato]'
+    events = service.events().list(
+        calendarId=PLATO_CALENDAR_ID,
+        timeMin=time_min,
+        timeMax=time_max,
+        singleEvents=True,
+        fields='items(id,summary)',
+        **params
+    ).execute().get('items', [])
+    if not shared:
+        return events
+    # Free-text search also matches descriptions and attendees, so re-check the title
+    return [e for e in events if '[Plato]' in e.get('summary', '')]
+
+
+def _delete_events(service, events: list[dict]) -> list[dict]:
+    """Delete events in batches. Returns those deleted."""
+    requests = [service.events().delete(calendarId=PLATO_CALENDAR_ID, eventId=e['id']) for e in events]
+    deleted = []
+    for event, error in zip(events, _execute_batched(service, requests)):
+        if error:
+            logger.error(f"Failed to delete event '{event.get('summary')}': {error}")
+        else:
+            deleted.append(event)
+    return deleted
 
 
 def clear_plato_events(service, week_start: datetime):
     """Remove all [Plato]-prefixed events for the given week."""
     week_end = week_start + timedelta(days=7)
 
-    events_result = service.events().list(
-        calendarId='primary',
-        timeMin=week_start.strftime("%Y-%m-%d") + 'T00:00:00Z',
-        timeMax=week_end.strftime("%Y-%m-%d") + 'T00:00:00Z',
-        singleEvents=True,
-        q='[Plato]'
-    ).execute()
-
-    events = events_result.get('items', [])
-    deleted = 0
-    for event in events:
-        if '[Plato]' in event.get('summary', ''):
-            service.events().delete(calendarId='primary', eventId=event['id']).execute()
-            deleted += 1
+    events = _list_plato_events(
+        service,
+        week_start.strftime("%Y-%m-%d") + 'T00:00:00Z',
+        week_end.strftime("%Y-%m-%d") + 'T00:00:00Z',
+    )
+    deleted = len(_delete_events(service, events))
 
     logger.info(f"Cleared {deleted} existing Plato events")
     return deleted
@@ -178,48 +236,44 @@ def clear_plato_events(service, week_start: datetime):
 
 def cancel_evening_events(service, date_str: str, from_time: str = "18:00"):
     """Cancel [Plato] events for a specific evening. Returns list of cancelled titles."""
-    cancelled = []
-
-    events_result = service.events().list(
-        calendarId='primary',
-        timeMin=f'{date_str}T{from_time}:00+00:00',
-        timeMax=f'{date_str}T23:59:00+00:00',
+    events = _list_plato_events(
+        service,
+        f'{date_str}T{from_time}:00+00:00',
+        f'{date_str}T23:59:00+00:00',
         timeZone='Europe/Dublin',
-        singleEvents=True,
-        q='[Plato]'
-    ).execute()
-
-    for event in events_result.get('items', []):
-        if '[Plato]' in event.get('summary', ''):
-            title = event['summary'].replace('[Plato] ', '')
-            service.events().delete(calendarId='primary', eventId=event['id']).execute()
-            cancelled.append(title)
-
-    return cancelled
+    )
+    return [e.get('summary', '').replace('[Plato] ', '') for e in _delete_events(service, events)]
 
 
 def cancel_specific_event(service, date_str: str, title_keyword: str):
     """Cancel a specific [Plato] event matching date + title keyword. Returns cancelled title or None."""
-    events_result = service.events().list(
-        calendarId='primary',
-        timeMin=f'{date_str}T00:00:00+00:00',
-        timeMax=f'{date_str}T23:59:00+00:00',
+    events = _list_plato_events(
+        service,
+        f'{date_str}T00:00:00+00:00',
+        f'{date_str}T23:59:00+00:00',
         timeZone='Europe/Dublin',
-        singleEvents=True,
-        q='[Plato]'
-    ).execute()
+    )
 
-    for event in events_result.get('items', []):
+    keyword = title_keyword.lower()
+    for event in events:
         summary = event.get('summary', '')
-        if '[Plato]' in summary and title_keyword.lower() in summary.lower():
-            service.events().delete(calendarId='primary', eventId=event['id']).execute()
+        if keyword in summary.lower():
+            service.events().delete(calendarId=PLATO_CALENDAR_ID, eventId=event['id']).execute()
             return summary.replace('[Plato] ', '')
     return None
 
 
 def create_event(service, date_str: str, start_time: str, end_time: str,
-                 title: str, description: str = None, color_id: str = None):
-    """Create a single Google Calendar event in Europe/Dublin timezone."""
+                 title: str, description: str = None, category: str = None):
+    """Create a single Google Calendar event in Europe/Dublin timezone, coloured by category."""
+    event = _event_body(date_str, start_time, end_time, title, description, category)
+    created = service.events().insert(calendarId=PLATO_CALENDAR_ID, body=event).execute()
+    logger.info(f"Created event: '{title}' on {date_str} {start_time}-{end_time}")
+    return created
+
+
+def _event_body(date_str: str, start_time: str, end_time: str,
+                title: str, description: str = None, category: str = None) -> dict:
     event = {
         'summary': f'[Plato] {title}',
         'start': {
@@ -234,73 +288,57 @@ def create_event(service, date_str: str, start_time: str, end_time: str,
 
     if description:
         event['description'] = description
+    color_id = COLOR_MAP.get(category)
     if color_id:
         event['colorId'] = color_id
-
-    created = service.events().insert(calendarId='primary', body=event).execute()
-    logger.info(f"Created event: '{title}' on {date_str} {start_time}-{end_time}")
-    return created
+    return event
 
 
 def create_weekly_events(service, schedule_events: list) -> int:
-    """Create all events from a planned schedule. Returns count of created events."""
-    created_count = 0
+    """Create all events from a planned schedule in batches. Returns count of created events."""
+    events, requests = [], []
     for event in schedule_events:
         try:
-            color = COLOR_MAP.get(event.get("category", ""))
-            create_event(
-                service,
+            body = _event_body(
                 date_str=event["date"],
                 start_time=event["start"],
                 end_time=event["end"],
                 title=event["title"],
                 description=event.get("description"),
-                color_id=color
+                category=event.get("category"),
             )
+        except KeyError as e:
+            logger.error(f"Failed to create event '{event.get('title')}': missing {e}")
+            continue
+        events.append(event)
+        requests.append(service.events().insert(calendarId=PLATO_CALENDAR_ID, body=body))
+
+    created_count = 0
+    for event, error in zip(events, _execute_batched(service, requests)):
+        if error:
+            logger.error(f"Failed to create event '{event.get('title')}': {error}")
+        else:
             created_count += 1
-        except Exception as e:
-            logger.error(f"Failed to create event '{event.get('title')}': {e}")
 
+    logger.info(f"Created {created_count} events")
     return created_count
 
 
-def get_schedule_prompt(week_start: datetime, active_projects: list[dict] = None) -> str:
-    """Build scheduling context string with templates for this week + next week + rules for Claude."""
-    this_week_template = get_weekly_template(week_start)
-    next_week_start = week_start + timedelta(days=7)
-    next_week_template = get_weekly_template(next_week_start)
-
-    # Build dynamic project allocation rules
-    if active_projects:
-        project_lines = []
-        slugs = []
-        for p in active_projects:
-            slugs.append(p["slug"])
-            project_lines.append(f"  - **{p['name']}** (slug: {p['slug']})" + (f" — {p['intent']}" if p.get('intent') else ""))
-        project_section = "Active projects to schedule:\n" + "\n".join(project_lines)
-        category_list = "|".join(slugs) + "|rest|exercise|personal"
-    else:
-        project_section = "No active projects. Schedule rest and personal time."
-        category_list = "rest|exercise|personal"
-
-    return f"""
-## WEEKLY SCHEDULE PLANNING
-
-Below are templates for this week and next week. Use the correct one based on which week Jason asks to plan.
-
-### This Week Template (week of {week_start.strftime('%A %B %d, %Y')})
-{json.dumps(this_week_template, indent=2)}
-
-### Next Week Template (week of {next_week_start.strftime('%A %B %d, %Y')})
-{json.dumps(next_week_template, indent=2)}
+def _format_template(template: dict) -> str:
+    """Compact template JSON, one day per line. indent=2 roughly tripled its prompt tokens."""
+    days = ",\n".join(orjson.dumps(day).decode() for day in template["days"])
+    return f'{{"week_start":"{template["week_start"]}","days":[\n{days}\n]}}'
 
-CRITICAL: Use the dates from the CORRECT template above. The week runs Monday through Sunday. Every event's "date" field MUST match a date from the chosen template. Do NOT skip Monday. Do NOT include dates outside the 7-day Mon-Sun range.
 
-### {project_section}
+@lru_cache(maxsize=16)
+def _week_template_text(week_start_iso: str) -> str:
+    """Formatted template for the week starting on this date. Depends only on the date, so it's built once."""
+    return _format_template(get_weekly_template(datetime.fromisoformat(week_start_iso)))
 
-Distribute project time across the week based on their goals and priorities from the soul doc.
 
-### Scheduling Rules
+# Static planning instructions, built once at import; get_schedule_prompt only fills in
+# the templates, project list and category list
+SCHEDULING_RULES = """### Scheduling Rules
 1. NEVER schedule over "work", "commute", "commute_prep", or "fixed" blocks — these are non-negotiable
 2. Only fill "free" blocks with project work, rest, or personal time
 3. Prioritise projects based on soul doc goals and upcoming deadlines
@@ -313,9 +351,9 @@ Distribute project time across the week based on their goals and priorities from
 10. Audrey time may be declared spontaneously — leave some buffer, don't over-optimise
 11. Office days (Tue/Wed/Thu): only the evening post-commute block is free
 12. WFH days (Mon/Fri): only the evening block is free (morning is personal time)
-13. Keep project event titles simple — use the project name + general focus area from goals, do NOT invent specific tasks or subtasks that aren't in the project's goals
+13. Keep project event titles simple — use the project name + general focus area from goals, do NOT invent specific tasks or subtasks that aren't in the project's goals"""
 
-### Response Format
+PLAN_RESPONSE_FORMAT = """### Response Format
 Return a plan_week action with the "week" field set to "this" or "next", plus an "events" array. Each event:
 ```
 {{
@@ -330,9 +368,9 @@ Return a plan_week action with the "week" field set to "this" or "next", plus an
         "category": "{category_list}|citco|exercise"
     }}]
 }}
-```
+```"""
 
-IMPORTANT: Include EVERY block for ALL 7 days (Monday through Sunday) in the events array — this builds a COMPLETE calendar for the week:
+PLAN_COVERAGE_RULES = """IMPORTANT: Include EVERY block for ALL 7 days (Monday through Sunday) in the events array — this builds a COMPLETE calendar for the week:
 - Work blocks (category: "citco") — e.g. "Citco (Office)" or "Citco (WFH)"
 - Work commute blocks (category: "citco") — e.g. "Commute to office", "Commute home"
 - Gym travel blocks (category: "exercise") — e.g. "Travel to gym", "Travel home from gym"
@@ -343,5 +381,46 @@ IMPORTANT: Include EVERY block for ALL 7 days (Monday through Sunday) in the eve
 
 The calendar should show Jason's ENTIRE day, not just the free blocks you filled in.
 Be specific with project titles: "Plato - Phase 3 testing" not just "Plato".
-Only schedule projects that are listed above as active. Do NOT invent projects.
+Only schedule projects that are listed above as active. Do NOT invent projects."""
+
+
+def get_schedule_prompt(week_start: datetime, active_projects: list[dict] = None) -> str:
+    """Build scheduling context string with templates for this week + next week + rules for Claude."""
+    next_week_start = week_start + timedelta(days=7)
+
+    # Build dynamic project allocation rules
+    if active_projects:
+        project_lines = []
+        slugs = []
+        for p in active_projects:
+            slugs.append(p["slug"])
+            project_lines.append(f"  - **{p['name']}** (slug: {p['slug']})" + (f" — {p['intent']}" if p.get('intent') else ""))
+        project_section = "Active projects to schedule:\n" + "\n".join(project_lines)
+        category_list = "|".join(slugs) + "|rest|exercise|personal"
+    else:
+        project_section = "No active projects. Schedule rest and personal time."
+        category_list = "rest|exercise|personal"
+
+    return f"""
+## WEEKLY SCHEDULE PLANNING
+
+Below are templates for this week and next week. Use the correct one based on which week Jason asks to plan.
+
+### This Week Template (week of {week_start.strftime('%A %B %d, %Y')})
+{_week_template_text(week_start.strftime("%Y-%m-%d"))}
+
+### Next Week Template (week of {next_week_start.strftime('%A %B %d, %Y')})
+{_week_template_text(next_week_start.strftime("%Y-%m-%d"))}
+
+CRITICAL: Use the dates from the CORRECT template above. The week runs Monday through Sunday. Every event's "date" field MUST match a date from the chosen template. Do NOT skip Monday. Do NOT include dates outside the 7-day Mon-Sun range.
+
+### {project_section}
+
+Distribute project time across the week based on their goals and priorities from the soul doc.
+
+{SCHEDULING_RULES}
+
+{PLAN_RESPONSE_FORMAT.format(category_list=category_list)}
+
+{PLAN_COVERAGE_RULES}
 """
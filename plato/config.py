@@ -3,7 +3,8 @@ import logging
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
-from anthropic import Anthropic
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -18,8 +19,24 @@ ALLOWED_USER_ID = int(os.environ.get("ALLOWED_USER_ID", 0))
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
 # Clients
-anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
+# One long-lived client; keep-alive connections skip the TLS handshake on each turn
+anthropic_client = AsyncAnthropic(
+    api_key=ANTHROPIC_API_KEY,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+        timeout=httpx.Timeout(120.0, connect=5.0),
+    ),
+)
 
 # Database
-engine = create_engine(DATABASE_URL)
+# Pool sized for the parallel prompt-context fetch plus the handler's own session.
+# Connections to the remote host are costly to open, so keep them warm (LIFO)
+# and recycle before the server-side idle timeout drops them.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=8,
+    max_overflow=4,
+    pool_recycle=1800,
+    pool_use_lifo=True,
+)
 SessionLocal = sessionmaker(bind=engine)
@@ -1,14 +1,17 @@
-from plato.db.core import get_recent_conversations, save_conversation, clear_conversations
+from plato.db.core import (
+    get_recent_conversations, get_history_with_summary, get_compactable_conversations, replace_with_summary,
+    save_conversation, save_conversation_turn, clear_conversations,
+)
 from plato.db.soul import get_soul_doc, add_soul_entry, supersede_soul_entry, update_soul_entry, format_soul_doc
 from plato.db.ideas import store_idea, park_idea, get_ideas, resolve_idea, format_ideas
 from plato.db.projects import (
     create_project, get_projects, get_project_by_slug, update_project_status,
     add_project_goal, achieve_goal, get_project_goals,
-    log_work, get_project_logs, get_project_summary,
+    log_work, log_work_by_slug, get_project_logs, get_project_summary,
     format_projects_summary, format_project_detail,
 )
 from plato.db.schedule import (
-    save_pending_plan, get_pending_plan, approve_pending_plan, reject_pending_plan,
+    save_pending_plan, get_pending_plan, get_pending_plan_summary, approve_pending_plan, reject_pending_plan,
     save_schedule_event, report_deviation, cancel_evening_schedule_events,
     cancel_schedule_event, update_schedule_event,
     get_schedule_for_date, get_schedule_for_week, format_todays_schedule,
@@ -25,12 +28,16 @@ from plato.db.fitness import (
     seed_progression, get_exercise_prescription, get_day_prescription,
     advance_progression, sync_progression_from_actual, auto_complete_week,
     format_fitness_summary, format_fitness_detail, get_fitness_prompt,
-    TRAINING_SPLIT, DAY_WEEKDAY_MAP,
+    TRAINING_SPLIT, DAY_WEEKDAY_MAP, EXERCISE_INFO,
 )
 
 __all__ = [
     "get_recent_conversations",
+    "get_history_with_summary",
+    "get_compactable_conversations",
+    "replace_with_summary",
     "save_conversation",
+    "save_conversation_turn",
     "clear_conversations",
     "get_soul_doc",
     "add_soul_entry",
@@ -50,12 +57,14 @@ __all__ = [
     "achieve_goal",
     "get_project_goals",
     "log_work",
+    "log_work_by_slug",
     "get_project_logs",
     "get_project_summary",
     "format_projects_summary",
     "format_project_detail",
     "save_pending_plan",
     "get_pending_plan",
+    "get_pending_plan_summary",
     "approve_pending_plan",
     "reject_pending_plan",
     "save_schedule_event",
@@ -101,4 +110,5 @@ __all__ = [
     "get_fitness_prompt",
     "TRAINING_SPLIT",
     "DAY_WEEKDAY_MAP",
+    "EXERCISE_INFO",
 ]
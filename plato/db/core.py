@@ -1,3 +1,10 @@
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
 from plato.config import SessionLocal
 from plato.models import Conversation
 
@@ -6,7 +13,8 @@ def get_recent_conversations(limit: int = 10) -> list[dict]:
     """Fetch recent conversation history."""
     with SessionLocal() as session:
         rows = (
-            session.query(Conversation)
+            session.query(Conversation.role, Conversation.content)
+            .filter(Conversation.is_summary.is_(False))
             .order_by(Conversation.created_at.desc())
             .limit(limit)
             .all()
@@ -17,15 +25,123 @@ def get_recent_conversations(limit: int = 10) -> list[dict]:
         ]
 
 
+# The newest turns are mirrored in memory once loaded, so the prompt doesn't re-read
+# what this process just wrote. Any write that isn't a plain append drops the mirror.
+# Entries are (row id, turn), so a write that lands after a reload isn't added twice.
+_history: deque[tuple[uuid.UUID, dict]] | None = None
+_history_summary: str | None = None
+_history_lock = threading.Lock()
+
+
+def get_history_with_summary(limit: int = 10) -> tuple[str | None, list[dict]]:
+    """Return the compacted summary (if any) and the most recent turns. Only the first call hits the DB."""
+    global _history, _history_summary
+    with _history_lock:
+        if _history is None or _history.maxlen < limit:
+            _history_summary, turns = _load_history(limit)
+            _history = deque(turns, maxlen=limit)
+        return _history_summary, [turn for _, turn in _history][-limit:]
+
+
+def _remember(*rows: tuple[uuid.UUID, dict]) -> None:
+    with _history_lock:
+        if _history is None:
+            return
+        loaded = {row_id for row_id, _ in _history}
+        _history.extend(row for row in rows if row[0] not in loaded)
+
+
+def _forget_history() -> None:
+    global _history
+    with _history_lock:
+        _history = None
+
+
+def _load_history(limit: int) -> tuple[str | None, list[tuple[uuid.UUID, dict]]]:
+    """Fetch the compacted summary (if any) and the most recent turns in one query."""
+    with SessionLocal() as session:
+        # At most one summary row exists, and it sorts ahead of every turn
+        rows = (
+            session.query(Conversation.id, Conversation.role, Conversation.content, Conversation.is_summary)
+            .order_by(Conversation.is_summary.desc(), Conversation.created_at.desc())
+            .limit(limit + 1)
+            .all()
+        )
+    summary = None
+    if rows and rows[0].is_summary:
+        summary = rows.pop(0).content
+    return summary, [
+        (r.id, {"role": r.role, "content": r.content})
+        for r in reversed(rows[:limit])
+    ]
+
+
+def get_compactable_conversations(keep: int) -> list[dict]:
+    """Fetch the summary and every turn older than the newest `keep`, oldest first."""
+    with SessionLocal() as session:
+        recent_cutoff = (
+            session.query(Conversation.created_at)
+            .filter(Conversation.is_summary.is_(False))
+            .order_by(Conversation.created_at.desc())
+            .offset(keep - 1)
+            .limit(1)
+            .scalar_subquery()
+        )
+        rows = (
+            session.query(Conversation.id, Conversation.role, Conversation.content, Conversation.is_summary)
+            .filter(Conversation.is_summary.is_(True) | (Conversation.created_at < recent_cutoff))
+            .order_by(Conversation.is_summary.desc(), Conversation.created_at)
+            .all()
+        )
+        return [
+            {"id": str(r.id), "role": r.role, "content": r.content, "is_summary": r.is_summary}
+            for r in rows
+        ]
+
+
+def replace_with_summary(conversation_ids: list[str], summary: str) -> None:
+    """Swap the given rows for a single summary row in one transaction."""
+    with SessionLocal() as session:
+        session.query(Conversation).filter(Conversation.id.in_(conversation_ids)).delete(synchronize_session=False)
+        session.add(Conversation(role="user", content=summary, is_summary=True))
+        session.commit()
+    _forget_history()
+
+
 def save_conversation(role: str, content: str) -> None:
     """Save a message to conversation history."""
+    row_id = uuid.uuid4()
+    with SessionLocal() as session:
+        session.add(Conversation(id=row_id, role=role, content=content))
+        session.commit()
+    _remember((row_id, {"role": role, "content": content}))
+
+
+def save_conversation_turn(user_message: str, reply: str) -> None:
+    """Save a user message and Plato's reply together. Explicit timestamps keep them ordered."""
+    user_id, reply_id = uuid.uuid4(), uuid.uuid4()
+    # Stamp both at save time, reply just after. Telegram's send time (one-second
+    # resolution) can predate the previous turn's reply and interleave the turns.
+    saved_at = datetime.now(timezone.utc)
     with SessionLocal() as session:
-        session.add(Conversation(role=role, content=content))
+        session.add_all([
+            Conversation(id=user_id, role="user", content=user_message, created_at=saved_at),
+            Conversation(
+                id=reply_id, role="assistant", content=reply, created_at=saved_at + timedelta(microseconds=1)
+            ),
+        ])
         session.commit()
+    _remember(
+        (user_id, {"role": "user", "content": user_message}),
+        (reply_id, {"role": "assistant", "content": reply}),
+    )
 
 
 def clear_conversations() -> None:
     """Delete all conversation history."""
     with SessionLocal() as session:
-        session.query(Conversation).delete()
+        # Nothing references conversations, so TRUNCATE can drop the table's contents
+        # outright instead of deleting (and later vacuuming) every row
+        session.execute(text("TRUNCATE TABLE conversations"))
         session.commit()
+    _forget_history()
@@ -1,7 +1,9 @@
 """Fitness domain: training blocks, workout sessions, exercise logs,
 modifications, weigh-ins, nutrition, sleep, deload tracking."""
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, insert
 
 from plato.config import SessionLocal
 from plato.models import (
@@ -93,6 +95,9 @@ TRAINING_SPLIT = {
 
 DAY_WEEKDAY_MAP = {0: "day1_chest", 1: "day2_back", 4: "day3_legs", 5: "day4_shoulders"}
 
+# Exercise slug → its TRAINING_SPLIT entry (display name, sets, rep range)
+EXERCISE_INFO = {ex["name"]: ex for day in TRAINING_SPLIT.values() for ex in day["exercises"]}
+
 
 # ---------------------------------------------------------------------------
 # Training Blocks
@@ -106,14 +111,14 @@ def _lookup_phase_for_date(date_str: str) -> dict | None:
     return None
 
 
-def get_current_block() -> dict | None:
+def get_current_block(today_str: str = None) -> dict | None:
     """Get the current training block.
 
     1. Active override in DB → use it
     2. Active auto-created block for current phase → use it
     3. No block exists → auto-create from PHASE_TIMELINE
     """
-    today_str = datetime.now().strftime("%Y-%m-%d")
+    today_str = today_str or date.today().isoformat()
     with SessionLocal() as session:
         # Check for override first
         override = (
@@ -218,10 +223,17 @@ def log_session(date: str, day_label: str, status: str = "completed",
         return str(ws.id)
 
 
+# Columns _session_to_dict reads; skips block link and bookkeeping
+_SESSION_COLUMNS = (
+    WorkoutSession.id, WorkoutSession.date, WorkoutSession.day_label, WorkoutSession.status,
+    WorkoutSession.feedback, WorkoutSession.deviation_notes,
+)
+
+
 def get_session_for_date(date: str) -> dict | None:
     """Get a session for a specific date, if one exists."""
     with SessionLocal() as session:
-        ws = session.query(WorkoutSession).filter_by(date=date).first()
+        ws = session.query(*_SESSION_COLUMNS).filter_by(date=date).first()
         if not ws:
             return None
         return _session_to_dict(ws)
@@ -240,7 +252,7 @@ def get_recent_sessions(limit: int = 8) -> list[dict]:
     """Get recent workout sessions ordered by date desc."""
     with SessionLocal() as session:
         rows = (
-            session.query(WorkoutSession)
+            session.query(*_SESSION_COLUMNS)
             .order_by(WorkoutSession.date.desc())
             .limit(limit)
             .all()
@@ -248,7 +260,7 @@ def get_recent_sessions(limit: int = 8) -> list[dict]:
         return [_session_to_dict(r) for r in rows]
 
 
-def _session_to_dict(ws: WorkoutSession) -> dict:
+def _session_to_dict(ws) -> dict:
     return {
         "id": str(ws.id),
         "date": ws.date,
@@ -279,18 +291,22 @@ def log_exercise(session_id: str, exercise: str, sets: int, reps: int,
 
 def log_exercises_bulk(session_id: str, lifts: list[dict]) -> int:
     """Log multiple exercises at once. Returns count logged."""
+    if not lifts:
+        return 0
     with SessionLocal() as session:
-        for lift in lifts:
-            el = ExerciseLog(
-                session_id=session_id,
-                exercise=lift["exercise"],
-                sets=lift["sets"],
-                reps=lift["reps"],
-                weight_kg=lift["weight_kg"],
-                rpe=lift.get("rpe"),
-                notes=lift.get("notes"),
-            )
-            session.add(el)
+        # One executemany INSERT; no ORM objects needed since nothing reads them back
+        session.execute(insert(ExerciseLog), [
+            {
+                "session_id": session_id,
+                "exercise": lift["exercise"],
+                "sets": lift["sets"],
+                "reps": lift["reps"],
+                "weight_kg": lift["weight_kg"],
+                "rpe": lift.get("rpe"),
+                "notes": lift.get("notes"),
+            }
+            for lift in lifts
+        ])
         session.commit()
         return len(lifts)
 
@@ -299,7 +315,8 @@ def get_last_weight_for_exercise(exercise: str) -> dict | None:
     """Get the most recent logged weight/sets/reps for an exercise."""
     with SessionLocal() as session:
         el = (
-            session.query(ExerciseLog)
+            session.query(ExerciseLog.exercise, ExerciseLog.sets, ExerciseLog.reps,
+                          ExerciseLog.weight_kg, ExerciseLog.created_at)
             .filter_by(exercise=exercise)
             .order_by(ExerciseLog.created_at.desc())
             .first()
@@ -319,7 +336,8 @@ def get_exercise_history(exercise: str, limit: int = 10) -> list[dict]:
     """Get recent history for an exercise."""
     with SessionLocal() as session:
         rows = (
-            session.query(ExerciseLog)
+            session.query(ExerciseLog.sets, ExerciseLog.reps, ExerciseLog.weight_kg,
+                          ExerciseLog.rpe, ExerciseLog.created_at)
             .filter_by(exercise=exercise)
             .order_by(ExerciseLog.created_at.desc())
             .limit(limit)
@@ -343,7 +361,7 @@ def create_modification(exercise: str, modification_type: str, detail: str,
                         valid_until: str = None) -> str:
     """Create a workout modification. Returns modification ID."""
     if not valid_from:
-        valid_from = datetime.now().strftime("%Y-%m-%d")
+        valid_from = date.today().isoformat()
     with SessionLocal() as session:
         mod = WorkoutModification(
             exercise=exercise, modification_type=modification_type,
@@ -356,9 +374,9 @@ def create_modification(exercise: str, modification_type: str, detail: str,
         return str(mod.id)
 
 
-def get_active_modifications() -> list[dict]:
+def get_active_modifications(today_str: str = None) -> list[dict]:
     """Get all active (non-expired, non-cancelled) modifications."""
-    today_str = datetime.now().strftime("%Y-%m-%d")
+    today_str = today_str or date.today().isoformat()
     with SessionLocal() as session:
         rows = (
             session.query(WorkoutModification)
@@ -405,7 +423,7 @@ def get_recent_weigh_ins(limit: int = 8) -> list[dict]:
     """Get recent weigh-ins (default ~2 months at weekly pace)."""
     with SessionLocal() as session:
         rows = (
-            session.query(WeighIn)
+            session.query(WeighIn.date, WeighIn.weight_kg, WeighIn.notes)
             .order_by(WeighIn.date.desc())
             .limit(limit)
             .all()
@@ -433,8 +451,8 @@ def get_weight_trend() -> dict:
         oldest = weigh_ins[-1]
         weight_diff = current - oldest["weight_kg"]
         try:
-            days_diff = (datetime.strptime(last_date, "%Y-%m-%d") -
-                         datetime.strptime(oldest["date"], "%Y-%m-%d")).days
+            days_diff = (date.fromisoformat(last_date) -
+                         date.fromisoformat(oldest["date"])).days
             if days_diff > 0:
                 rate_per_week = round(weight_diff / (days_diff / 7), 2)
                 if rate_per_week > 0.05:
@@ -511,25 +529,35 @@ def log_nutrition_batch(entries: list[dict]) -> int:
 def get_nutrition_averages(days: int = 7) -> dict:
     """Get nutrition averages over the last N logged days."""
     with SessionLocal() as session:
-        rows = (
-            session.query(DailyNutrition)
+        # Aggregate in Postgres over the last N rows rather than pulling them all back
+        recent = (
+            session.query(DailyNutrition.date, DailyNutrition.calories, DailyNutrition.protein_g,
+                          DailyNutrition.carbs_g, DailyNutrition.fat_g)
             .order_by(DailyNutrition.date.desc())
             .limit(days)
-            .all()
+            .subquery()
         )
-        if not rows:
+        row = session.query(
+            func.count().label("n"),
+            func.avg(recent.c.calories).label("calories"),
+            func.avg(recent.c.protein_g).label("protein_g"),
+            func.avg(recent.c.carbs_g).label("carbs_g"),
+            func.avg(recent.c.fat_g).label("fat_g"),
+            func.min(recent.c.date).label("from_date"),
+            func.max(recent.c.date).label("to_date"),
+        ).select_from(recent).one()
+        if not row.n:
             return {"avg_calories": None, "avg_protein_g": None,
                     "avg_carbs_g": None, "avg_fat_g": None, "count": 0}
 
-        n = len(rows)
         return {
-            "avg_calories": round(sum(r.calories for r in rows) / n),
-            "avg_protein_g": round(sum(r.protein_g for r in rows) / n),
-            "avg_carbs_g": round(sum(r.carbs_g for r in rows) / n),
-            "avg_fat_g": round(sum(r.fat_g for r in rows) / n),
-            "count": n,
-            "from_date": rows[-1].date,
-            "to_date": rows[0].date,
+            "avg_calories": round(row.calories),
+            "avg_protein_g": round(row.protein_g),
+            "avg_carbs_g": round(row.carbs_g),
+            "avg_fat_g": round(row.fat_g),
+            "count": row.n,
+            "from_date": row.from_date,
+            "to_date": row.to_date,
         }
 
 
@@ -537,7 +565,10 @@ def get_daily_nutrition(limit: int = 14) -> list[dict]:
     """Get recent daily nutrition entries."""
     with SessionLocal() as session:
         rows = (
-            session.query(DailyNutrition)
+            session.query(
+                DailyNutrition.date, DailyNutrition.calories, DailyNutrition.protein_g,
+                DailyNutrition.carbs_g, DailyNutrition.fat_g,
+            )
             .order_by(DailyNutrition.date.desc())
             .limit(limit)
             .all()
@@ -576,20 +607,31 @@ def log_sleep(date: str, hours: float, notes: str = None) -> str:
 def get_sleep_average(days: int = 7) -> dict:
     """Get sleep average over last N logged days."""
     with SessionLocal() as session:
-        rows = (
-            session.query(SleepLog)
+        # One row back: the latest night plus window aggregates over the last N
+        recent = (
+            session.query(SleepLog.date, SleepLog.hours)
             .order_by(SleepLog.date.desc())
             .limit(days)
-            .all()
+            .subquery()
         )
-        if not rows:
+        row = (
+            session.query(
+                recent.c.date,
+                recent.c.hours,
+                func.avg(recent.c.hours).over().label("avg"),
+                func.count().over().label("n"),
+            )
+            .order_by(recent.c.date.desc())
+            .first()
+        )
+        if not row:
             return {"avg": None, "count": 0, "last": None}
-        avg = round(sum(r.hours for r in rows) / len(rows), 1)
+        avg = round(float(row.avg), 1)
         return {
             "avg": avg,
-            "count": len(rows),
-            "last": rows[0].hours,
-            "last_date": rows[0].date,
+            "count": row.n,
+            "last": row.hours,
+            "last_date": row.date,
             "below_7": avg < 7.0,
         }
 
@@ -601,7 +643,12 @@ def get_sleep_average(days: int = 7) -> dict:
 def get_active_deload_cycle() -> dict | None:
     """Get the current active deload cycle."""
     with SessionLocal() as session:
-        dc = session.query(DeloadTracker).filter_by(status="active").first()
+        dc = (
+            session.query(DeloadTracker.id, DeloadTracker.cycle_start_date,
+                          DeloadTracker.weeks_completed, DeloadTracker.deload_done)
+            .filter_by(status="active")
+            .first()
+        )
         if not dc:
             return None
         return {
@@ -648,7 +695,7 @@ def complete_deload() -> bool:
         dc.status = "completed"
         # Start a new cycle
         new_dc = DeloadTracker(
-            cycle_start_date=datetime.now().strftime("%Y-%m-%d"),
+            cycle_start_date=date.today().isoformat(),
             weeks_completed=0, status="active",
         )
         session.add(new_dc)
@@ -687,11 +734,7 @@ def _parse_rep_range(rep_str: str) -> tuple[int, int] | None:
 
 def _get_exercise_info(exercise_slug: str) -> dict | None:
     """Look up exercise info (display name, sets, rep range) from TRAINING_SPLIT."""
-    for day_key, day_data in TRAINING_SPLIT.items():
-        for ex in day_data["exercises"]:
-            if ex["name"] == exercise_slug:
-                return ex
-    return None
+    return EXERCISE_INFO.get(exercise_slug)
 
 
 def seed_progression(exercise: str, weight_kg: float, starting_reps: int = None) -> dict:
@@ -742,6 +785,13 @@ def get_exercise_prescription(exercise: str) -> dict | None:
     """Get the current prescription for an exercise.
     Falls back to last logged weight if no progression entry exists.
     Returns None if no data at all (needs seeding)."""
+    with SessionLocal() as session:
+        ep = session.query(ExerciseProgression).filter_by(exercise=exercise).first()
+    return _build_prescription(exercise, ep)
+
+
+def _build_prescription(exercise: str, ep) -> dict | None:
+    """Prescription for an exercise given its progression row (or None if unseeded)."""
     ex_info = _get_exercise_info(exercise)
     if not ex_info:
         return None
@@ -758,20 +808,18 @@ def get_exercise_prescription(exercise: str) -> dict | None:
             "excluded": True,
         }
 
-    # Check progression table first
-    with SessionLocal() as session:
-        ep = session.query(ExerciseProgression).filter_by(exercise=exercise).first()
-        if ep:
-            return {
-                "exercise": exercise,
-                "display": ex_info["display"],
-                "weight_kg": ep.weight_kg,
-                "sets": ex_info["sets"],
-                "reps": ep.current_reps,
-                "rep_range": f"{rep_range[0]}-{rep_range[1]}",
-                "sessions_at_current": ep.sessions_at_current,
-                "excluded": False,
-            }
+    # Progression table first
+    if ep:
+        return {
+            "exercise": exercise,
+            "display": ex_info["display"],
+            "weight_kg": ep.weight_kg,
+            "sets": ex_info["sets"],
+            "reps": ep.current_reps,
+            "rep_range": f"{rep_range[0]}-{rep_range[1]}",
+            "sessions_at_current": ep.sessions_at_current,
+            "excluded": False,
+        }
 
     # Fallback: bootstrap from last logged exercise data
     last = get_last_weight_for_exercise(exercise)
@@ -807,9 +855,15 @@ def get_day_prescription(day_label: str) -> list[dict]:
         return []
 
     day = TRAINING_SPLIT[day_label]
+    names = [ex["name"] for ex in day["exercises"]]
+    # One query for the whole day's progression rows
+    with SessionLocal() as session:
+        rows = session.query(ExerciseProgression).filter(ExerciseProgression.exercise.in_(names)).all()
+    by_exercise = {ep.exercise: ep for ep in rows}
+
     prescriptions = []
-    for ex in day["exercises"]:
-        p = get_exercise_prescription(ex["name"])
+    for name in names:
+        p = _build_prescription(name, by_exercise.get(name))
         if p:
             prescriptions.append(p)
     return prescriptions
@@ -904,18 +958,18 @@ def auto_complete_week(week_start: str) -> list[dict]:
     """Auto-complete unlogged gym sessions from a week.
     For each gym day: if no session exists, create one at prescribed numbers
     and advance progression. Returns summary of what was auto-completed."""
-    monday = datetime.strptime(week_start, "%Y-%m-%d")
-    today = datetime.now()
+    monday = date.fromisoformat(week_start)
+    today = date.today()
     results = []
 
     for weekday_offset, day_label in DAY_WEEKDAY_MAP.items():
         session_date = monday + timedelta(days=weekday_offset)
 
         # Don't auto-complete future dates or today
-        if session_date.date() >= today.date():
+        if session_date >= today:
             continue
 
-        date_str = session_date.strftime("%Y-%m-%d")
+        date_str = session_date.isoformat()
 
         # Check if a session already exists for this date
         existing = get_session_for_date(date_str)
@@ -983,18 +1037,30 @@ def auto_complete_week(week_start: str) -> list[dict]:
 # Formatting (for prompt injection and query responses)
 # ---------------------------------------------------------------------------
 
-def _get_todays_day_label() -> str | None:
+def _get_todays_day_label(today: date = None) -> str | None:
     """Get today's day label from the weekday map, or None if rest day."""
-    weekday = datetime.now().weekday()
+    weekday = (today or date.today()).weekday()
     return DAY_WEEKDAY_MAP.get(weekday)
 
 
-def format_fitness_summary() -> str:
+def format_fitness_summary(today: date = None) -> str:
     """Build the fitness context section for the system prompt."""
+    today = today or date.today()
+    return _format_summary(
+        today,
+        block=get_current_block(today.isoformat()),
+        nut_avg=get_nutrition_averages(days=7),
+        sessions=get_recent_sessions(limit=4),
+    )
+
+
+def _format_summary(today: date, block: dict | None, nut_avg: dict, sessions: list[dict]) -> str:
+    """Render the summary from already-fetched block, nutrition and sessions."""
+    today_str = today.isoformat()
+    mods = get_active_modifications(today_str)
     lines = []
 
     # Current block/phase
-    block = get_current_block()
     if block:
         fat_str = f"{block['fat_min']}-{block['fat_max']}g fat" if block['fat_min'] else ""
         lines.append(f"**Phase:** {block['name']} ({block['phase']}) — {block['start_date']} to {block['end_date'] or '?'}")
@@ -1011,12 +1077,11 @@ def format_fitness_summary() -> str:
         lines.append("**Phase:** No active training block (between phases or pre-program)")
 
     # Today's workout
-    day_label = _get_todays_day_label()
+    day_label = _get_todays_day_label(today)
     if day_label and day_label in TRAINING_SPLIT:
         day = TRAINING_SPLIT[day_label]
         lines.append(f"**Today:** {day['label']} ({day['weekday']})")
         # Show each exercise with prescribed weight/reps from progression engine
-        mods = get_active_modifications()
         mod_map = {m["exercise"]: m for m in mods}
         prescriptions = get_day_prescription(day_label)
         for p in prescriptions:
@@ -1031,7 +1096,7 @@ def format_fitness_summary() -> str:
                 lines.append(f"  {p['display']}: → {p['weight_kg']}kg × {p['sets']}×{p['reps']} ({p['rep_range']}){mod_note}")
     else:
         # Rest day — find next session
-        today_wd = datetime.now().weekday()
+        today_wd = today.weekday()
         for offset in range(1, 8):
             next_wd = (today_wd + offset) % 7
             if next_wd in DAY_WEEKDAY_MAP:
@@ -1041,7 +1106,6 @@ def format_fitness_summary() -> str:
                 break
 
     # Active modifications
-    mods = get_active_modifications()
     if mods:
         mod_strs = []
         for m in mods:
@@ -1058,12 +1122,6 @@ def format_fitness_summary() -> str:
         if trend["rate_per_week"] is not None:
             sign = "+" if trend["rate_per_week"] > 0 else ""
             weight_parts.append(f"{sign}{trend['rate_per_week']}kg/wk")
-        # Phase target
-        if block:
-            for pt in PHASE_TIMELINE:
-                if pt["name"] == block["name"] and "target" not in pt:
-                    break
-            # Target from timeline (heuristic: show start→end weight)
         lines.append(f"**Weight:** {' | '.join(weight_parts)}")
 
     # Sleep
@@ -1073,7 +1131,6 @@ def format_fitness_summary() -> str:
         lines.append(f"**Sleep:** 7-day avg: {sleep['avg']}h{warning}")
 
     # Nutrition (7-day avg)
-    nut_avg = get_nutrition_averages(days=7)
     if nut_avg["avg_calories"]:
         nut_parts = [f"{nut_avg['avg_calories']} kcal", f"{nut_avg['avg_protein_g']}g protein",
                      f"{nut_avg['avg_carbs_g']}g carbs", f"{nut_avg['avg_fat_g']}g fat"]
@@ -1089,10 +1146,9 @@ def format_fitness_summary() -> str:
         lines.append(f"**Deload:** Week {deload['weeks_completed']} of 8")
 
     # Recent sessions (last 4)
-    sessions = get_recent_sessions(limit=4)
     if sessions:
         session_strs = []
-        for s in sessions:
+        for s in sessions[:4]:
             day_info = TRAINING_SPLIT.get(s["day_label"], {})
             day_short = day_info.get("weekday", s["day_label"])[:3]
             status_icon = "✓" if s["status"] == "completed" else s["status"]
@@ -1105,15 +1161,18 @@ def format_fitness_summary() -> str:
 
 def format_fitness_detail() -> str:
     """Detailed fitness status for query_fitness responses."""
-    lines = [format_fitness_summary(), ""]
+    # Fetch shared data once and reuse it for both the summary and the detail
+    today = date.today()
+    block = get_current_block(today.isoformat())
+    nut_avg = get_nutrition_averages(days=7)
+    sessions = get_recent_sessions(limit=8)
+    lines = [_format_summary(today, block, nut_avg, sessions), ""]
 
     # Nutrition
-    nut_avg = get_nutrition_averages(days=7)
     if nut_avg["avg_calories"]:
         lines.append("**Nutrition (7-day avg):**")
         parts = [f"{nut_avg['avg_calories']} kcal", f"{nut_avg['avg_protein_g']}g P",
                  f"{nut_avg['avg_carbs_g']}g C", f"{nut_avg['avg_fat_g']}g F"]
-        block = get_current_block()
         if block and block["calorie_target"]:
             diff = nut_avg["avg_calories"] - block["calorie_target"]
             sign = "+" if diff > 0 else ""
@@ -1127,26 +1186,22 @@ def format_fitness_detail() -> str:
             lines.append(f"  {d['date']}: {d['calories']} kcal | {d['protein_g']}g P | {d['carbs_g']}g C | {d['fat_g']}g F")
 
     # Recent sessions with more detail
-    sessions = get_recent_sessions(limit=8)
     if sessions:
         lines.append("\n**Session History:**")
         for s in sessions:
             day_info = TRAINING_SPLIT.get(s["day_label"], {})
             label = day_info.get("label", s["day_label"])
-            status_str = s["status"]
-            line = f"  {s['date']} — {label} [{status_str}]"
+            parts = [f"  {s['date']} — {label} [{s['status']}]"]
             if s.get("feedback"):
-                line += f" — {s['feedback']}"
+                parts.append(f" — {s['feedback']}")
             if s.get("deviation_notes"):
-                line += f" (deviation: {s['deviation_notes']})"
-            lines.append(line)
+                parts.append(f" (deviation: {s['deviation_notes']})")
+            lines.append("".join(parts))
 
     return "\n".join(lines)
 
 
-def get_fitness_prompt() -> str:
-    """Static fitness rules for the system prompt."""
-    return """
+FITNESS_RULES = """
 ## Fitness Program Rules
 Training split: Mon (Chest+Delts), Tue (Back+Biceps+Yoke), Fri (Legs+Abs), Sat (Shoulders+Arms)
 Pre-workout: Thoracic foam roll 60s, band pull-aparts 2x15, wall slides 2x10
@@ -1168,3 +1223,8 @@ Fallback: 3 days (drop Sat), 2 days (Day 1 + Day 3 only), extended absence (delo
 
 Exception-based: Assume gym sessions completed as planned. Only log when Jason mentions specific numbers, deviations, or missed sessions. Silence = compliance.
 """
+
+
+def get_fitness_prompt() -> str:
+    """Static fitness rules for the system prompt."""
+    return FITNESS_RULES
@@ -33,7 +33,10 @@ def get_ideas(status: str = None) -> list[dict]:
     """Fetch ideas, optionally filtered by status."""
     now = datetime.now(timezone.utc)
     with SessionLocal() as session:
-        query = session.query(Idea).order_by(Idea.created_at)
+        query = (
+            session.query(Idea.id, Idea.idea, Idea.context, Idea.status, Idea.created_at, Idea.eligible_date)
+            .order_by(Idea.created_at)
+        )
         if status:
             query = query.filter(Idea.status == status)
         rows = query.all()
@@ -75,12 +78,10 @@ def format_ideas(ideas: list[dict]) -> str:
 
     parts = []
     for i in ideas:
-        line = f"- [{i['status'].upper()}] {i['idea']}"
-        if i.get("context"):
-            line += f" (context: {i['context']})"
+        context = f" (context: {i['context']})" if i.get("context") else ""
+        eligible = ""
         if i["status"] == "parked" and i.get("days_remaining") is not None:
-            eligible = "ELIGIBLE" if i["is_eligible"] else f"{i['days_remaining']}d remaining"
-            line += f" [{eligible}]"
-        line += f"\n  ID: {i['id'][:8]}..."
-        parts.append(line)
+            eligible = " [ELIGIBLE]" if i["is_eligible"] else f" [{i['days_remaining']}d remaining]"
+        parts.append(f"- [{i['status'].upper()}] {i['idea']}{context}{eligible}")
+        parts.append(f"  ID: {i['id'][:8]}...")
     return "\n".join(parts)
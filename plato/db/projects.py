@@ -1,5 +1,9 @@
+from collections import defaultdict
 from datetime import datetime, timezone
 
+from sqlalchemy import func
+
+from plato.cache import ttl_cache
 from plato.config import SessionLocal
 from plato.models import Project, ProjectGoal, ProjectLog
 
@@ -13,6 +17,7 @@ def create_project(name: str, slug: str, intent: str = None) -> str:
         return str(project.id)
 
 
+@ttl_cache(seconds=300, tables=("projects",))
 def get_projects(status: str = None) -> list[dict]:
     """Fetch projects, optionally filtered by status."""
     with SessionLocal() as session:
@@ -44,9 +49,18 @@ def _to_dict(r) -> dict:
     }
 
 
+# Separators stripped when fuzzy-matching slugs ("side-project" == "side project")
+_SLUG_STRIP = str.maketrans("", "", "-_ ")
+
+
+def _normalize_slug(slug: str) -> str:
+    return slug.lower().translate(_SLUG_STRIP)
+
+
+@ttl_cache(seconds=300, tables=("projects",))
 def get_project_by_slug(slug: str) -> dict | None:
     """Fetch a single project by slug. Tries exact match, then normalized fuzzy match."""
-    normalized = slug.lower().replace("-", "").replace("_", "").replace(" ", "")
+    normalized = _normalize_slug(slug)
     with SessionLocal() as session:
         # Exact match first
         r = session.query(Project).filter_by(slug=slug).first()
@@ -55,7 +69,7 @@ def get_project_by_slug(slug: str) -> dict | None:
         # Fuzzy: normalize and try contains/startswith
         all_projects = session.query(Project).all()
         for r in all_projects:
-            stored = r.slug.lower().replace("-", "").replace("_", "").replace(" ", "")
+            stored = _normalize_slug(r.slug)
             if stored == normalized or normalized.startswith(stored) or stored.startswith(normalized):
                 return _to_dict(r)
         return None
@@ -67,12 +81,9 @@ def update_project_status(project_id: str, status: str) -> bool:
     if status not in valid:
         raise ValueError(f"Invalid status: {status}. Must be one of {valid}")
     with SessionLocal() as session:
-        project = session.query(Project).filter_by(id=project_id).first()
-        if not project:
-            return False
-        project.status = status
+        count = session.query(Project).filter_by(id=project_id).update({"status": status}, synchronize_session=False)
         session.commit()
-        return True
+        return count > 0
 
 
 def add_project_goal(project_id: str, timeframe: str, goal_text: str, target_date: str = None) -> str:
@@ -95,35 +106,41 @@ def add_project_goal(project_id: str, timeframe: str, goal_text: str, target_dat
 def achieve_goal(goal_id: str) -> bool:
     """Mark a goal as achieved. Returns True if found."""
     with SessionLocal() as session:
-        goal = session.query(ProjectGoal).filter_by(id=goal_id).first()
-        if not goal:
-            return False
-        goal.achieved = True
-        goal.achieved_at = datetime.now(timezone.utc)
+        # One UPDATE; the row count says whether the goal exists
+        count = (
+            session.query(ProjectGoal)
+            .filter_by(id=goal_id)
+            .update({"achieved": True, "achieved_at": datetime.now(timezone.utc)}, synchronize_session=False)
+        )
         session.commit()
-        return True
+        return count > 0
+
+
+def _query_project_goals(session, project_id: str) -> list[dict]:
+    rows = (
+        session.query(ProjectGoal.id, ProjectGoal.timeframe, ProjectGoal.goal_text, ProjectGoal.target_date,
+                      ProjectGoal.achieved, ProjectGoal.achieved_at)
+        .filter_by(project_id=project_id)
+        .order_by(ProjectGoal.created_at)
+        .all()
+    )
+    return [
+        {
+            "id": str(r.id),
+            "timeframe": r.timeframe,
+            "goal_text": r.goal_text,
+            "target_date": r.target_date.isoformat() if r.target_date else None,
+            "achieved": r.achieved,
+            "achieved_at": r.achieved_at.isoformat() if r.achieved_at else None,
+        }
+        for r in rows
+    ]
 
 
 def get_project_goals(project_id: str) -> list[dict]:
     """Fetch goals for a project."""
     with SessionLocal() as session:
-        rows = (
-            session.query(ProjectGoal)
-            .filter_by(project_id=project_id)
-            .order_by(ProjectGoal.created_at)
-            .all()
-        )
-        return [
-            {
-                "id": str(r.id),
-                "timeframe": r.timeframe,
-                "goal_text": r.goal_text,
-                "target_date": r.target_date.isoformat() if r.target_date else None,
-                "achieved": r.achieved,
-                "achieved_at": r.achieved_at.isoformat() if r.achieved_at else None,
-            }
-            for r in rows
-        ]
+        return _query_project_goals(session, project_id)
 
 
 def log_work(project_id: str, summary: str, duration_mins: int = None, mood: str = None) -> str:
@@ -140,26 +157,41 @@ def log_work(project_id: str, summary: str, duration_mins: int = None, mood: str
         return str(log.id)
 
 
+def log_work_by_slug(slug: str, summary: str, duration_mins: int = None, mood: str = None) -> str | None:
+    """Log a work session against a project slug in one transaction. Returns the project name, or None if not found."""
+    with SessionLocal() as session:
+        project = session.query(Project.id, Project.name).filter_by(slug=slug).first()
+        if not project:
+            return None
+        session.add(ProjectLog(project_id=project.id, summary=summary, duration_mins=duration_mins, mood=mood))
+        session.commit()
+        return project.name
+
+
+def _query_project_logs(session, project_id: str, limit: int) -> list[dict]:
+    rows = (
+        session.query(ProjectLog.id, ProjectLog.summary, ProjectLog.duration_mins, ProjectLog.mood, ProjectLog.logged_at)
+        .filter_by(project_id=project_id)
+        .order_by(ProjectLog.logged_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": str(r.id),
+            "summary": r.summary,
+            "duration_mins": r.duration_mins,
+            "mood": r.mood,
+            "logged_at": r.logged_at.isoformat() if r.logged_at else None,
+        }
+        for r in rows
+    ]
+
+
 def get_project_logs(project_id: str, limit: int = 10) -> list[dict]:
     """Fetch recent work logs for a project."""
     with SessionLocal() as session:
-        rows = (
-            session.query(ProjectLog)
-            .filter_by(project_id=project_id)
-            .order_by(ProjectLog.logged_at.desc())
-            .limit(limit)
-            .all()
-        )
-        return [
-            {
-                "id": str(r.id),
-                "summary": r.summary,
-                "duration_mins": r.duration_mins,
-                "mood": r.mood,
-                "logged_at": r.logged_at.isoformat() if r.logged_at else None,
-            }
-            for r in rows
-        ]
+        return _query_project_logs(session, project_id, limit)
 
 
 def get_project_summary(slug: str) -> dict | None:
@@ -167,8 +199,11 @@ def get_project_summary(slug: str) -> dict | None:
     project = get_project_by_slug(slug)
     if not project:
         return None
-    project["goals"] = get_project_goals(project["id"])
-    project["recent_logs"] = get_project_logs(project["id"], limit=5)
+    project = dict(project)  # cached lookup — don't mutate the shared dict
+    # Goals and logs share one session (one pooled connection) instead of one each
+    with SessionLocal() as session:
+        project["goals"] = _query_project_goals(session, project["id"])
+        project["recent_logs"] = _query_project_logs(session, project["id"], limit=5)
     return project
 
 
@@ -177,22 +212,36 @@ def format_projects_summary(projects: list[dict]) -> str:
     if not projects:
         return "No active projects."
 
+    # Two queries for all projects instead of two per project
+    project_ids = [p["id"] for p in projects]
+    open_goals = defaultdict(list)
+    with SessionLocal() as session:
+        goal_rows = (
+            session.query(ProjectGoal.project_id, ProjectGoal.timeframe, ProjectGoal.goal_text)
+            .filter(ProjectGoal.project_id.in_(project_ids), ProjectGoal.achieved.is_not(True))
+            .order_by(ProjectGoal.created_at)
+            .all()
+        )
+        for r in goal_rows:
+            open_goals[str(r.project_id)].append(r)
+
+        log_rows = (
+            session.query(ProjectLog.project_id, func.max(ProjectLog.logged_at))
+            .filter(ProjectLog.project_id.in_(project_ids))
+            .group_by(ProjectLog.project_id)
+            .all()
+        )
+        last_logged = {str(project_id): logged_at for project_id, logged_at in log_rows}
+
     parts = []
     for p in projects:
-        line = f"**{p['name']}** (slug: {p['slug']}) [{p['status']}]"
-        if p.get("intent"):
-            line += f" — {p['intent']}"
-        parts.append(line)
+        intent = f" — {p['intent']}" if p.get("intent") else ""
+        parts.append(f"**{p['name']}** (slug: {p['slug']}) [{p['status']}]{intent}")
 
-        goals = get_project_goals(p["id"])
-        active_goals = [g for g in goals if not g["achieved"]]
-        if active_goals:
-            for g in active_goals:
-                parts.append(f"  - [{g['timeframe']}] {g['goal_text']}")
+        parts.extend(f"  - [{g.timeframe}] {g.goal_text}" for g in open_goals[p["id"]])
 
-        logs = get_project_logs(p["id"], limit=1)
-        if logs:
-            parts.append(f"  Last log: {logs[0]['logged_at'][:10]}")
+        if last_logged.get(p["id"]):
+            parts.append(f"  Last log: {last_logged[p['id']].date().isoformat()}")
 
     return "\n".join(parts)
 
@@ -221,11 +270,8 @@ def format_project_detail(summary: dict) -> str:
     if logs:
         parts.append("\nRecent work:")
         for l in logs:
-            entry = f"  - {l['logged_at'][:10]}: {l['summary']}"
-            if l.get("duration_mins"):
-                entry += f" ({l['duration_mins']}min)"
-            if l.get("mood"):
-                entry += f" [{l['mood']}]"
-            parts.append(entry)
+            duration = f" ({l['duration_mins']}min)" if l.get("duration_mins") else ""
+            mood = f" [{l['mood']}]" if l.get("mood") else ""
+            parts.append(f"  - {l['logged_at'][:10]}: {l['summary']}{duration}{mood}")
 
     return "\n".join(parts)
@@ -1,6 +1,8 @@
-import json
+import orjson
 from datetime import datetime, timezone
 
+from sqlalchemy import JSON, cast, func, insert, update
+
 from plato.config import SessionLocal
 from plato.models import ScheduleEvent, PendingPlan
 
@@ -8,18 +10,14 @@ from plato.models import ScheduleEvent, PendingPlan
 def save_pending_plan(week_start: str, events: list) -> str:
     """Save a pending weekly plan. Rejects any existing pending plan for same week."""
     with SessionLocal() as session:
-        existing = (
-            session.query(PendingPlan)
-            .filter_by(week_start=week_start, status="pending")
-            .first()
+        # Supersede and insert in one transaction, without loading the old plan's events
+        session.query(PendingPlan).filter_by(week_start=week_start, status="pending").update(
+            {"status": "rejected", "resolved_at": datetime.now(timezone.utc)}, synchronize_session=False
         )
-        if existing:
-            existing.status = "rejected"
-            existing.resolved_at = datetime.now(timezone.utc)
 
         plan = PendingPlan(
             week_start=week_start,
-            events_json=json.dumps(events),
+            events_json=orjson.dumps(events).decode(),
             status="pending",
         )
         session.add(plan)
@@ -41,33 +39,53 @@ def get_pending_plan() -> dict | None:
         return {
             "id": str(plan.id),
             "week_start": plan.week_start,
-            "events": json.loads(plan.events_json),
+            "events": orjson.loads(plan.events_json),
             "status": plan.status,
             "created_at": plan.created_at.isoformat() if plan.created_at else None,
         }
 
 
+def get_pending_plan_summary() -> dict | None:
+    """Week and event count of the most recent pending plan, counted in the DB."""
+    with SessionLocal() as session:
+        row = (
+            session.query(PendingPlan.week_start, func.json_array_length(cast(PendingPlan.events_json, JSON)))
+            .filter_by(status="pending")
+            .order_by(PendingPlan.created_at.desc())
+            .first()
+        )
+        if not row:
+            return None
+        return {"week_start": row[0], "event_count": row[1]}
+
+
 def approve_pending_plan(plan_id: str) -> list[dict]:
     """Mark plan as approved, create ScheduleEvent rows, return events for calendar."""
     with SessionLocal() as session:
-        plan = session.query(PendingPlan).filter_by(id=plan_id).first()
+        # Claim the plan and read it back in one statement; a plan can only be approved once
+        plan = session.execute(
+            update(PendingPlan)
+            .where(PendingPlan.id == plan_id, PendingPlan.status == "pending")
+            .values(status="approved", resolved_at=datetime.now(timezone.utc))
+            .returning(PendingPlan.week_start, PendingPlan.events_json)
+        ).first()
         if not plan:
             return []
 
-        plan.status = "approved"
-        plan.resolved_at = datetime.now(timezone.utc)
-
-        events = json.loads(plan.events_json)
-        for ev in events:
-            session.add(ScheduleEvent(
-                date=ev["date"],
-                start_time=ev["start"],
-                end_time=ev["end"],
-                title=ev["title"],
-                category=ev.get("category"),
-                status="scheduled",
-                week_start=plan.week_start,
-            ))
+        events = orjson.loads(plan.events_json)
+        if events:
+            session.execute(insert(ScheduleEvent), [
+                {
+                    "date": ev["date"],
+                    "start_time": ev["start"],
+                    "end_time": ev["end"],
+                    "title": ev["title"],
+                    "category": ev.get("category"),
+                    "status": "scheduled",
+                    "week_start": plan.week_start,
+                }
+                for ev in events
+            ])
 
         session.commit()
         return events
@@ -76,13 +94,11 @@ def approve_pending_plan(plan_id: str) -> list[dict]:
 def reject_pending_plan(plan_id: str) -> bool:
     """Reject a pending plan."""
     with SessionLocal() as session:
-        plan = session.query(PendingPlan).filter_by(id=plan_id).first()
-        if not plan:
-            return False
-        plan.status = "rejected"
-        plan.resolved_at = datetime.now(timezone.utc)
+        count = session.query(PendingPlan).filter_by(id=plan_id).update(
+            {"status": "rejected", "resolved_at": datetime.now(timezone.utc)}, synchronize_session=False
+        )
         session.commit()
-        return True
+        return count > 0
 
 
 def save_schedule_event(date: str, start: str, end: str, title: str,
@@ -159,49 +175,48 @@ def update_schedule_event(date: str, title_keyword: str, new_date: str = None,
 def report_deviation(date: str, title_keyword: str, reason: str) -> bool:
     """Mark an event as deviated by matching date + title substring."""
     with SessionLocal() as session:
-        events = (
+        count = (
             session.query(ScheduleEvent)
             .filter(
                 ScheduleEvent.date == date,
                 ScheduleEvent.status == "scheduled",
                 ScheduleEvent.title.ilike(f"%{title_keyword}%"),
             )
-            .all()
+            .update({"status": "deviated", "deviation_reason": reason}, synchronize_session=False)
         )
-        if not events:
-            return False
-        for ev in events:
-            ev.status = "deviated"
-            ev.deviation_reason = reason
         session.commit()
-        return True
+        return count > 0
 
 
 def cancel_evening_schedule_events(date: str, from_time: str = "18:00") -> int:
     """Cancel DB schedule events for evening of a given date."""
     with SessionLocal() as session:
-        events = (
+        # A single UPDATE rather than loading each row and flushing one UPDATE per event
+        count = (
             session.query(ScheduleEvent)
             .filter(
                 ScheduleEvent.date == date,
                 ScheduleEvent.start_time >= from_time,
                 ScheduleEvent.status == "scheduled",
             )
-            .all()
+            .update({"status": "cancelled"}, synchronize_session=False)
         )
-        count = 0
-        for ev in events:
-            ev.status = "cancelled"
-            count += 1
         session.commit()
         return count
 
 
+# Columns the event dicts expose; skips deviation notes and bookkeeping
+_EVENT_COLUMNS = (
+    ScheduleEvent.id, ScheduleEvent.date, ScheduleEvent.start_time, ScheduleEvent.end_time,
+    ScheduleEvent.title, ScheduleEvent.category, ScheduleEvent.status,
+)
+
+
 def get_schedule_for_date(date: str) -> list[dict]:
     """Get today's scheduled events."""
     with SessionLocal() as session:
         rows = (
-            session.query(ScheduleEvent)
+            session.query(*_EVENT_COLUMNS)
             .filter(ScheduleEvent.date == date, ScheduleEvent.status == "scheduled")
             .order_by(ScheduleEvent.start_time)
             .all()
@@ -224,7 +239,7 @@ def get_schedule_for_week(week_start: str) -> list[dict]:
     """Get all schedule events for a week (all statuses)."""
     with SessionLocal() as session:
         rows = (
-            session.query(ScheduleEvent)
+            session.query(*_EVENT_COLUMNS, ScheduleEvent.deviation_reason)
             .filter(ScheduleEvent.week_start == week_start)
             .order_by(ScheduleEvent.date, ScheduleEvent.start_time)
             .all()
@@ -1,25 +1,38 @@
 from datetime import datetime, timezone
-from collections import defaultdict
 
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from plato.cache import ttl_cache
 from plato.config import SessionLocal
 from plato.models import SoulDoc
 
 CATEGORY_ORDER = ["goal_lifetime", "goal_5yr", "goal_2yr", "goal_1yr", "philosophy", "rule"]
+CATEGORY_LABELS = {
+    "goal_lifetime": "Lifetime Goals",
+    "goal_5yr": "5-Year Goals",
+    "goal_2yr": "2-Year Goals",
+    "goal_1yr": "1-Year Goals",
+    "philosophy": "Philosophy",
+    "rule": "Rules",
+}
 
 
+@ttl_cache(seconds=300, tables=("soul_doc",))
 def get_soul_doc() -> dict[str, list[str]]:
     """Fetch all active soul doc entries, grouped by category."""
     with SessionLocal() as session:
+        # Group server-side: one row per category with its entries in creation order
         rows = (
-            session.query(SoulDoc)
+            session.query(
+                SoulDoc.category,
+                func.array_agg(aggregate_order_by(SoulDoc.content, SoulDoc.created_at)),
+            )
             .filter(SoulDoc.superseded_at.is_(None))
-            .order_by(SoulDoc.created_at)
+            .group_by(SoulDoc.category)
             .all()
         )
-        grouped = defaultdict(list)
-        for row in rows:
-            grouped[row.category].append(row.content)
-        return dict(grouped)
+        return dict(rows)
 
 
 def add_soul_entry(category: str, content: str) -> str:
@@ -50,15 +63,18 @@ def update_soul_entry(category: str, old_content: str, new_content: str) -> str:
         raise ValueError(f"Invalid category: {category}. Must be one of {CATEGORY_ORDER}")
     with SessionLocal() as session:
         # Find and supersede the old entry by matching category + content substring
-        entries = (
+        entry = (
             session.query(SoulDoc)
-            .filter(SoulDoc.category == category, SoulDoc.superseded_at.is_(None))
-            .all()
+            .filter(
+                SoulDoc.category == category,
+                SoulDoc.superseded_at.is_(None),
+                func.lower(SoulDoc.content).contains(old_content.lower(), autoescape=True),
+            )
+            .order_by(SoulDoc.created_at)
+            .first()
         )
-        for entry in entries:
-            if old_content.lower() in entry.content.lower():
-                entry.superseded_at = datetime.now(timezone.utc)
-                break
+        if entry:
+            entry.superseded_at = datetime.now(timezone.utc)
         # Add the refined version
         new_entry = SoulDoc(category=category, content=new_content)
         session.add(new_entry)
@@ -71,19 +87,11 @@ def format_soul_doc(grouped: dict[str, list[str]]) -> str:
     if not grouped:
         return "No soul doc entries yet."
 
-    labels = {
-        "goal_lifetime": "Lifetime Goals",
-        "goal_5yr": "5-Year Goals",
-        "goal_2yr": "2-Year Goals",
-        "goal_1yr": "1-Year Goals",
-        "philosophy": "Philosophy",
-        "rule": "Rules",
-    }
     parts = []
     for cat in CATEGORY_ORDER:
         entries = grouped.get(cat)
         if entries:
-            parts.append(f"**{labels[cat]}**")
+            parts.append(f"**{CATEGORY_LABELS[cat]}**")
             for e in entries:
                 parts.append(f"- {e}")
     return "\n".join(parts)
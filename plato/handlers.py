@@ -1,81 +1,214 @@
-import json
+import asyncio
+import re
+from collections import defaultdict
+from datetime import datetime
+import orjson
 from telegram import Update
+from telegram.constants import ChatAction
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 from plato.config import ALLOWED_USER_ID, anthropic_client, logger
-from plato.db import save_conversation, clear_conversations
-from plato.prompts import build_system_prompt, build_messages_with_history
-from plato.actions import process_action
+from plato.db import (
+    save_conversation_turn, clear_conversations, get_compactable_conversations, replace_with_summary,
+    get_history_with_summary,
+)
+from plato.prompts import build_system_prompt, build_messages_with_history, HISTORY_MAX_MESSAGES
+from plato.actions import process_action, PLAN_APPROVAL_PROMPT
 
+# Action block: a JSON object in a ```json fence. A missing closing fence
+# (reply cut off at max_tokens) is tolerated as long as the object is complete.
+_JSON_FENCE = re.compile(r"```json\s*(\{.*?\})\s*(?:```|\Z)", re.DOTALL)
+_CLOSED_JSON_FENCE = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
 
-async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle incoming messages."""
-    user_id = update.effective_user.id
 
-    if user_id != ALLOWED_USER_ID:
-        await update.message.reply_text("Plato serves only one master.")
-        return
+# Blocking DB/Calendar calls in flight at once. Concurrent updates share the
+# SQLAlchemy pool, so beyond this they'd only queue for a connection on a worker thread.
+BLOCKING_CONCURRENCY = 8
+_blocking_slots = asyncio.Semaphore(BLOCKING_CONCURRENCY)
 
-    user_message = update.message.text
-    logger.info(f"Received: {user_message[:100]}...")
 
-    # Save user message to history
-    save_conversation("user", user_message)
+async def _run_blocking(fn, *args):
+    """Run a blocking call on a worker thread, keeping the event loop free."""
+    async with _blocking_slots:
+        return await asyncio.to_thread(fn, *args)
 
-    system_prompt = build_system_prompt()
-    messages = build_messages_with_history(user_message)
 
-    response = anthropic_client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4096,
-        system=system_prompt,
-        messages=messages
+def _dispatch_action(match):
+    """Parse the action block and start it on a worker thread. Returns the task, or None if unparseable."""
+    try:
+        action_data = orjson.loads(match.group(1))
+    except orjson.JSONDecodeError as e:
+        logger.error(f"Failed to parse action JSON: {e}")
+        return None
+    return asyncio.create_task(_run_blocking(process_action, action_data))
+
+
+def _normalize(user_message: str) -> str:
+    return " ".join(user_message.lower().split())
+
+
+# One turn at a time per chat: a message is only answered once the previous
+# turn is in history, so its prompt sees it and turns are stored in send order.
+# /clear and /compact take the same lock so they never rewrite history mid-turn.
+_chat_locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+async def _generate_reply(user_message: str, now: datetime) -> str:
+    """Ask Claude for a reply, running any action block it emits."""
+    # Prompt context and history are independent reads — build both off the loop at once
+    system_prompt, messages = await asyncio.gather(
+        _run_blocking(build_system_prompt, user_message, now),
+        _run_blocking(build_messages_with_history, user_message),
     )
 
-    reply = response.content[0].text
+    parts = []
+    match = None
+    action_future = None
+    stream_error = None
+    try:
+        async with anthropic_client.messages.stream(
+            model="claude-sonnet-4-20250514",
+            max_tokens=4096,
+            system=system_prompt,
+            messages=messages
+        ) as stream:
+            async for text in stream.text_stream:
+                parts.append(text)
+                # Run the action as soon as its fence closes, while the prose is still generating
+                if match is None and "`" in text:
+                    match = _CLOSED_JSON_FENCE.search("".join(parts))
+                    if match:
+                        action_future = _dispatch_action(match)
+            final = await stream.get_final_message()
+    except Exception as e:
+        # An action already under way still writes to the DB/Calendar — report its result
+        # with whatever prose arrived rather than failing the turn silently
+        if action_future is None:
+            raise
+        logger.error(f"Reply stream failed after its action started: {e}")
+        stream_error = e
+    else:
+        # Confirms the static system block is being served from Anthropic's prompt cache
+        usage = final.usage
+        logger.info(
+            f"Tokens: {usage.input_tokens} in (cache read {usage.cache_read_input_tokens or 0}, "
+            f"cache write {usage.cache_creation_input_tokens or 0}), {usage.output_tokens} out"
+        )
+
+    reply = "".join(parts)
+    if match is None:
+        match = _JSON_FENCE.search(reply)
+        if match:
+            action_future = _dispatch_action(match)
 
     # Process JSON action block if present
     action_result = None
-    if "```json" in reply:
-        try:
-            json_start = reply.index("```json") + 7
-            json_end = reply.index("```", json_start)
-            json_str = reply[json_start:json_end].strip()
-            action_data = json.loads(json_str)
+    if action_future:
+        action_result = await action_future
+        logger.info(f"Action result: {action_result}")
 
-            action_result = process_action(action_data)
-            logger.info(f"Action result: {action_result}")
+        # Strip the JSON block from the reply
+        reply = (reply[:match.start()] + reply[match.end():]).strip()
 
-            # Strip the JSON block from the reply
-            reply = reply[:reply.index("```json")] + reply[json_end + 3:]
-            reply = reply.strip()
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to parse action JSON: {e}")
+    if stream_error:
+        reply = f"{reply}\n\n(Reply cut off: {type(stream_error).__name__})".strip()
 
     # Prepend action status if there was one
     if action_result:
         reply = f"[{action_result}]\n\n{reply}"
 
-    # Save assistant response to history
-    save_conversation("assistant", reply)
+    return reply
+
+
+# The literal reply the plan preview asks for — handled without a model call
+_APPROVE_PHRASES = frozenset({"approve", "approved"})
 
+
+def _approve_if_previewed() -> str | None:
+    """Approve the pending plan if the last reply was its preview, else return None."""
+    _, history = get_history_with_summary(limit=HISTORY_MAX_MESSAGES)
+    last = history[-1] if history else None
+    if not last or last["role"] != "assistant" or PLAN_APPROVAL_PROMPT not in last["content"]:
+        return None
+    return process_action({"action": "approve_plan"})
+
+
+async def _keep_typing(chat) -> None:
+    """Show "typing…" until cancelled. Telegram drops the status after ~5s, so keep renewing it."""
+    while True:
+        try:
+            await chat.send_action(ChatAction.TYPING)
+        except TelegramError as e:
+            logger.warning(f"Typing indicator failed: {e}")
+        await asyncio.sleep(4)
+
+
+def _split_reply(reply: str, limit: int = 4000) -> list[str]:
+    """Split on double newlines to keep logical chunks together, each chunk up to ~limit chars."""
+    chunks = []
+    current, size = [], 0  # paragraphs in the chunk being built, and their joined length
+    for paragraph in reply.split("\n\n"):
+        if size + len(paragraph) + 2 > limit:
+            if size:
+                chunks.append("\n\n".join(current).strip())
+            current, size = [paragraph], len(paragraph)
+        elif size:
+            current.append(paragraph)
+            size += len(paragraph) + 2
+        else:
+            current, size = [paragraph], len(paragraph)
+    if size:
+        chunks.append("\n\n".join(current).strip())
+    return chunks
+
+
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle incoming messages."""
+    user_id = update.effective_user.id
+
+    if user_id != ALLOWED_USER_ID:
+        await update.message.reply_text("Plato serves only one master.")
+        return
+
+    async with _chat_locks[update.effective_chat.id]:
+        await _respond(update)
+
+
+async def _respond(update: Update) -> None:
+    """Answer one message and record the turn in history."""
+    user_message = update.message.text
+    logger.info(f"Received: {user_message[:100]}...")
+
+    # "approve" straight after the plan preview needs no model call — push the plan directly
+    reply = None
+    if _normalize(user_message).rstrip(".!") in _APPROVE_PHRASES:
+        reply = await _run_blocking(_approve_if_previewed)
+        if reply is not None:
+            logger.info("Approved pending plan without a model call")
+
+    if reply is None:
+        # Acknowledge straight away; a weekly plan can take a while to generate
+        typing = asyncio.create_task(_keep_typing(update.message.chat))
+        try:
+            # The message's send time (in local time) stands in for "now" for the whole turn
+            reply = await _generate_reply(user_message, update.message.date.astimezone())
+        finally:
+            typing.cancel()
+
+    try:
+        await _send_reply(update, reply)
+    finally:
+        # Save both turns to history in one transaction.
+        # The reply is already out; the chat lock holds the next message until this lands.
+        await _run_blocking(save_conversation_turn, user_message, reply)
+
+
+async def _send_reply(update: Update, reply: str) -> None:
     # Telegram has a 4096 char limit — split long messages
     if len(reply) <= 4096:
         await update.message.reply_text(reply)
     else:
-        # Split on double newlines to keep logical chunks together
-        chunks = []
-        current = ""
-        for paragraph in reply.split("\n\n"):
-            if len(current) + len(paragraph) + 2 > 4000:
-                if current:
-                    chunks.append(current.strip())
-                current = paragraph
-            else:
-                current = current + "\n\n" + paragraph if current else paragraph
-        if current:
-            chunks.append(current.strip())
-
-        for chunk in chunks:
+        for chunk in _split_reply(reply):
             # Final safety split if a single paragraph is > 4096
             while len(chunk) > 4096:
                 await update.message.reply_text(chunk[:4096])
@@ -96,5 +229,50 @@ async def clear_history(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     if update.effective_user.id != ALLOWED_USER_ID:
         return
 
-    clear_conversations()
-    await update.message.reply_text("Conversation history cleared. Fresh start.")
+    # Wait out any turn in progress, so its save can't land after the clear
+    async with _chat_locks[update.effective_chat.id]:
+        await _run_blocking(clear_conversations)
+        await update.message.reply_text("Conversation history cleared. Fresh start.")
+
+
+# Summarizing old history is a cheap job — no need for the main model
+COMPACT_MODEL = "claude-3-5-haiku-20241022"
+COMPACT_PROMPT = (
+    "Summarize this conversation between Jason and his mentor Plato for future context. "
+    "Keep decisions, commitments, open questions and anything Jason said about himself; "
+    "drop small talk. Write concise bullet points."
+)
+
+
+async def compact_history(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /compact command - fold older conversation history into one summary."""
+    if update.effective_user.id != ALLOWED_USER_ID:
+        return
+
+    async with _chat_locks[update.effective_chat.id]:
+        await _compact(update)
+
+
+async def _compact(update: Update) -> None:
+    """Summarize the history older than the prompt window and swap it in."""
+    # Everything the history window can still reach stays verbatim
+    rows = await _run_blocking(get_compactable_conversations, HISTORY_MAX_MESSAGES)
+    turns = sum(1 for r in rows if not r["is_summary"])
+    if not turns:
+        await update.message.reply_text("Nothing to compact yet.")
+        return
+
+    transcript = "\n\n".join(
+        f"Earlier summary:\n{r['content']}" if r["is_summary"] else f"{r['role']}: {r['content']}"
+        for r in rows
+    )
+    response = await anthropic_client.messages.create(
+        model=COMPACT_MODEL,
+        max_tokens=1024,
+        system=COMPACT_PROMPT,
+        messages=[{"role": "user", "content": transcript}],
+    )
+    summary = response.content[0].text.strip()
+
+    await _run_blocking(replace_with_summary, [r["id"] for r in rows], summary)
+    await update.message.reply_text(f"Compacted {turns} older messages into a summary.")
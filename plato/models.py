@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, Float, ForeignKey, func
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, Float, ForeignKey, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
 
@@ -8,15 +8,22 @@ Base = declarative_base()
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_created_at", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     role = Column(String, nullable=False)  # "user" or "assistant"
     content = Column(Text, nullable=False)
+    is_summary = Column(Boolean, nullable=False, default=False, server_default="false")  # compacted older turns
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class SoulDoc(Base):
     __tablename__ = "soul_doc"
+    __table_args__ = (
+        Index("ix_soul_doc_active", "created_at", postgresql_where=text("superseded_at IS NULL")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     category = Column(String, nullable=False)  # goal_lifetime, goal_5yr, goal_2yr, goal_1yr, philosophy, rule
@@ -51,6 +58,9 @@ class Project(Base):
 
 class ProjectGoal(Base):
     __tablename__ = "project_goals"
+    __table_args__ = (
+        Index("ix_project_goals_open", "project_id", "created_at", postgresql_where=text("achieved IS NOT TRUE")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
@@ -64,6 +74,9 @@ class ProjectGoal(Base):
 
 class ProjectLog(Base):
     __tablename__ = "project_logs"
+    __table_args__ = (
+        Index("ix_project_logs_project_logged", "project_id", "logged_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
@@ -75,6 +88,10 @@ class ProjectLog(Base):
 
 class ScheduleEvent(Base):
     __tablename__ = "schedule_events"
+    __table_args__ = (
+        Index("ix_schedule_events_date_status", "date", "status"),
+        Index("ix_schedule_events_week_start", "week_start"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     date = Column(String, nullable=False)               # "YYYY-MM-DD"
@@ -90,6 +107,9 @@ class ScheduleEvent(Base):
 
 class PendingPlan(Base):
     __tablename__ = "pending_plans"
+    __table_args__ = (
+        Index("ix_pending_plans_status_created", "status", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     week_start = Column(String, nullable=False)          # "YYYY-MM-DD" Monday
@@ -121,6 +141,9 @@ class TrainingBlock(Base):
 
 class WorkoutSession(Base):
     __tablename__ = "workout_sessions"
+    __table_args__ = (
+        Index("ix_workout_sessions_date", "date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     date = Column(String, nullable=False)                    # "YYYY-MM-DD"
@@ -134,6 +157,9 @@ class WorkoutSession(Base):
 
 class ExerciseLog(Base):
     __tablename__ = "exercise_logs"
+    __table_args__ = (
+        Index("ix_exercise_logs_exercise_created", "exercise", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     session_id = Column(UUID(as_uuid=True), ForeignKey("workout_sessions.id"), nullable=False)
@@ -148,6 +174,9 @@ class ExerciseLog(Base):
 
 class WorkoutModification(Base):
     __tablename__ = "workout_modifications"
+    __table_args__ = (
+        Index("ix_workout_modifications_active", "valid_from", postgresql_where=text("status = 'active'")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     exercise = Column(String, nullable=False)                # exercise slug
@@ -162,6 +191,9 @@ class WorkoutModification(Base):
 
 class WeighIn(Base):
     __tablename__ = "weigh_ins"
+    __table_args__ = (
+        Index("ix_weigh_ins_date", "date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid())
     date = Column(String, nullable=False)                    # "YYYY-MM-DD"
@@ -1,5 +1,7 @@
-from plato.db import get_recent_conversations
-from plato.prompts.base import get_base_prompt
+from datetime import datetime
+
+from plato.db import get_history_with_summary, get_fitness_prompt
+from plato.prompts.base import PERSONA, get_base_prompt, needs_scheduling_context
 
 
 ACTION_SCHEMA = """
@@ -206,19 +208,54 @@ CRITICAL RULES:
 """
 
 
-def build_system_prompt() -> str:
-    """Build Plato's system prompt — personality + soul doc + action schemas."""
-    return get_base_prompt() + ACTION_SCHEMA
+# Persona, rules and schemas never change between calls, so join them once at import.
+# Sent first as its own block so Anthropic can cache the prefix across turns.
+STATIC_PROMPT = PERSONA + "\n\n" + (get_fitness_prompt() + ACTION_SCHEMA).strip()
 
 
-def build_messages_with_history(user_message: str) -> list[dict]:
-    """Build message list including conversation history."""
-    history = get_recent_conversations(limit=10)
+def build_system_prompt(user_message: str = None, now: datetime | None = None) -> list[dict]:
+    """Build Plato's system prompt blocks — cached persona + rules + action schemas, then live context.
+    Planning templates are included when there's no message to judge by or it looks like planning."""
+    include_scheduling = user_message is None or needs_scheduling_context(user_message)
+    return [
+        {"type": "text", "text": STATIC_PROMPT, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": get_base_prompt(include_scheduling, now)},
+    ]
+
 
-    messages = []
-    for msg in history:
-        messages.append({"role": msg["role"], "content": msg["content"]})
+# History is windowed by estimated tokens (~4 chars each), newest turns first,
+# so one long plan reply can't crowd the prompt with everything before it
+HISTORY_TOKEN_BUDGET = 3000
+HISTORY_MAX_MESSAGES = 20
 
+
+def build_messages_with_history(user_message: str) -> list[dict]:
+    """Build message list including as much recent conversation history as fits the token budget.
+    A compacted summary of older turns, if there is one, leads the list."""
+    summary, history = get_history_with_summary(limit=HISTORY_MAX_MESSAGES)
+    summary_message = None
+    if summary:
+        summary_message = {"role": "user", "content": f"[Summary of earlier conversation]\n{summary}"}
+
+    budget = HISTORY_TOKEN_BUDGET - len(user_message) // 4
+    if summary_message:
+        budget -= len(summary_message["content"]) // 4
+    start = len(history)
+    while start > 0:
+        cost = len(history[start - 1]["content"]) // 4 + 1
+        if cost > budget:
+            break
+        budget -= cost
+        start -= 1
+
+    # The API requires the conversation to open with a user turn
+    while start < len(history) and history[start]["role"] != "user":
+        start += 1
+
+    messages = [{"role": msg["role"], "content": msg["content"]} for msg in history[start:]]
+    if summary_message:
+        # Back-to-back user turns are merged by the API, so no filler reply is needed
+        messages.insert(0, summary_message)
     messages.append({"role": "user", "content": user_message})
 
     return messages
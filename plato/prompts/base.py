@@ -1,47 +1,21 @@
-from datetime import datetime, timedelta
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from plato.db.soul import get_soul_doc, format_soul_doc, CATEGORY_ORDER
 from plato.db.projects import get_projects, format_projects_summary
-from plato.db.schedule import get_schedule_for_date, format_todays_schedule, get_pending_plan
-from plato.db.fitness import format_fitness_summary, get_fitness_prompt
+from plato.db.schedule import get_schedule_for_date, format_todays_schedule, get_pending_plan_summary
+from plato.db.fitness import format_fitness_summary
 from plato.calendar import get_schedule_prompt
+from plato.cache import ttl_cache
 
 
-def _next_week_start() -> datetime:
+def _next_week_start(today: date) -> datetime:
     """Return this week's Monday (go back to most recent Monday)."""
-    today = datetime.now()
-    weekday = today.weekday()
-    monday = today - timedelta(days=weekday)
-    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+    monday = today - timedelta(days=today.weekday())
+    return datetime(monday.year, monday.month, monday.day)
 
 
-def get_base_prompt() -> str:
-    """Return the base prompt with personality, soul doc, active projects, schedule context."""
-    soul_doc = get_soul_doc()
-    soul_section = format_soul_doc(soul_doc)
-
-    projects = get_projects(status="active")
-    projects_section = format_projects_summary(projects)
-
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    todays_events = get_schedule_for_date(today_str)
-    schedule_section = format_todays_schedule(todays_events)
-
-    pending = get_pending_plan()
-    pending_section = ""
-    if pending:
-        pending_section = f"\n\n## Pending Weekly Plan\nA plan for week of {pending['week_start']} is awaiting approval ({len(pending['events'])} events). Ask Jason if he wants to review/approve it."
-
-    # Include scheduling template so Claude knows Jason's constraints when planning
-    week_start = _next_week_start()
-    scheduling_context = get_schedule_prompt(week_start, active_projects=projects)
-
-    # Fitness context
-    fitness_section = format_fitness_summary()
-    fitness_rules = get_fitness_prompt()
-
-    return f"""Current date and time: {datetime.now().strftime("%A %B %d, %Y %H:%M")}
-
-You are Plato, Jason's personal AI mentor. You embody stoic wisdom and hold him accountable.
+PERSONA = """You are Plato, Jason's personal AI mentor. You embody stoic wisdom and hold him accountable.
 
 Your role:
 - Be direct, honest, and occasionally challenging
@@ -50,9 +24,62 @@ Your role:
 - Reference Jason's goals and principles when relevant
 - When creating projects, check alignment with the soul doc
 - Celebrate goal achievements in context of the bigger picture
-- If no action is needed (just conversation), respond naturally
+- If no action is needed (just conversation), respond naturally"""
+
+# Messages that may need the week templates + planning rules (the largest section).
+# Deliberately broad: a false positive only costs tokens, a miss breaks planning.
+PLAN_WEEK_RE = re.compile(r"\b(?:plan\w*|replan\w*|(?:re)?schedul\w*|calendar|week\w*|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.IGNORECASE)
+
+
+def needs_scheduling_context(user_message: str) -> bool:
+    """True if the message looks like it's about planning or changing the week."""
+    return PLAN_WEEK_RE.search(user_message) is not None
+
+
+# Trailing spaces and runs of blank lines left by empty sections are pure token cost
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
 
-## Jason's Soul Doc
+# Context is rebuilt at most this often; any DB write invalidates it sooner
+CONTEXT_TTL_SECONDS = 60
+
+# One worker per independent context section
+_context_pool = ThreadPoolExecutor(max_workers=5, thread_name_prefix="plato-context")
+
+
+def get_base_prompt(include_scheduling: bool = True, now: datetime | None = None) -> str:
+    """Return the per-turn prompt: current date/time, soul doc, active projects, schedule, fitness.
+    The weekly planning templates are only added when include_scheduling is set or a plan is pending."""
+    now = now or datetime.now()
+    return f"Current date and time: {now.strftime('%A %B %d, %Y %H:%M')}\n\n" + _build_context(now.date(), include_scheduling)
+
+
+@ttl_cache(seconds=CONTEXT_TTL_SECONDS)
+def _build_context(today: date, include_scheduling: bool) -> str:
+    """DB-backed context sections. Cached per day until the data changes."""
+    # Sections read independent tables, so fetch them concurrently
+    soul_future = _context_pool.submit(get_soul_doc)
+    projects_future = _context_pool.submit(get_projects, status="active")
+    events_future = _context_pool.submit(get_schedule_for_date, today.isoformat())
+    pending_future = _context_pool.submit(get_pending_plan_summary)
+    fitness_future = _context_pool.submit(format_fitness_summary, today)
+
+    soul_section = format_soul_doc(soul_future.result())
+
+    projects = projects_future.result()
+    projects_section = format_projects_summary(projects)
+
+    schedule_section = format_todays_schedule(events_future.result())
+
+    pending = pending_future.result()
+    pending_section = ""
+    if pending:
+        pending_section = f"\n\n## Pending Weekly Plan\nA plan for week of {pending['week_start']} is awaiting approval ({pending['event_count']} events). Ask Jason if he wants to review/approve it."
+
+    # Fitness context
+    fitness_section = fitness_future.result()
+
+    sections = [f"""## Jason's Soul Doc
 {soul_section}
 
 ## Active Projects
@@ -62,8 +89,13 @@ Your role:
 {schedule_section}{pending_section}
 
 ## Fitness Status
-{fitness_section}
+{fitness_section}"""]
 
-{scheduling_context}
+    # Include scheduling template so Claude knows Jason's constraints when planning
+    # (a pending plan means follow-ups like "move Tuesday's block" need it too)
+    if include_scheduling or pending:
+        week_start = _next_week_start(today)
+        sections.append(get_schedule_prompt(week_start, active_projects=projects))
 
-{fitness_rules}"""
+    context = "\n\n".join(sections)
+    return _BLANK_RUN_RE.sub("\n\n", _TRAILING_SPACE_RE.sub("", context))
@@ -3,19 +3,43 @@ Plato Bot — Entry Point
 Personal AI mentor for Jason. Built with stoic wisdom and accountability.
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import AIORateLimiter, Application, CommandHandler, MessageHandler, filters
 from plato.config import TELEGRAM_TOKEN, logger
-from plato.handlers import handle_message, start, clear_history
+from plato.handlers import BLOCKING_CONCURRENCY, handle_message, start, clear_history, compact_history
+
+
+async def _post_init(app: Application) -> None:
+    """Size the worker pool that handlers' blocking calls run on."""
+    # asyncio.to_thread uses the loop's default executor, which is sized from the CPU
+    # count (5 threads on a 1-vCPU container) — fewer than the handlers may run at once
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_CONCURRENCY, thread_name_prefix="plato-io")
+    )
 
 
 def main() -> None:
     """Start the bot."""
-    app = Application.builder().token(TELEGRAM_TOKEN).build()
+    # Handlers keep blocking work off the loop, so updates can be processed concurrently.
+    # With replies sent in parallel (and long ones in several chunks), throttle outgoing
+    # calls to Telegram's flood limits and retry once told to back off (RetryAfter).
+    app = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        .concurrent_updates(True)
+        .connection_pool_size(32)
+        .rate_limiter(AIORateLimiter(max_retries=3))
+        .post_init(_post_init)
+        .build()
+    )
 
     # Command handlers
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("clear", clear_history))
+    app.add_handler(CommandHandler("compact", compact_history))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
 
     logger.info("Plato is starting...")